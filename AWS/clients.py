@@ -0,0 +1,153 @@
+import threading
+import boto3
+
+from botocore.config import Config
+from common import config
+from AWS.scheduler import RequestScheduler
+
+#Load config file
+config = config.load_configs()
+
+
+class ClientPool:
+    """
+    Process-wide registry of boto3 clients.
+
+    Clients are created once per (service, region, credentials) and reused by every
+    finder, so a scan keeps the service models loaded and the connections warm.
+    """
+
+    def __init__(self, max_pool_connections=10, tcp_keepalive=False, max_attempts=3):
+        """
+        Initializes the ClientPool with the connection settings shared by all clients.
+
+        Args:
+            max_pool_connections (int): Maximum number of connections kept open per client.
+            tcp_keepalive (bool): Enables TCP keep-alive on the client connections.
+            max_attempts (int): Attempts of each call, retried with exponential backoff and jitter
+                by the botocore "standard" retry mode.
+        """
+        self.client_config = Config(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=tcp_keepalive,
+            retries={"mode": "standard", "max_attempts": max_attempts}
+        )
+        self.clients = {}
+        self.hooks = []
+        self.lock = threading.Lock()
+
+    def get_session(self):
+        """
+        Retrieves the default boto3 session, creating it when needed.
+
+        Returns:
+            boto3.Session: The default boto3 session.
+        """
+        with self.lock:
+            if boto3.DEFAULT_SESSION is None:
+                boto3.setup_default_session()
+            return boto3.DEFAULT_SESSION
+
+    def get_credentials_key(self, session):
+        """
+        Builds the part of the registry key that identifies the session credentials.
+
+        Args:
+            session (boto3.Session): The session used to create clients.
+
+        Returns:
+            tuple: The profile name and the access key of the session.
+        """
+        credentials = session.get_credentials()
+        access_key = credentials.access_key if credentials else None
+        return (session.profile_name, access_key)
+
+    def get_client(self, service: str, region: str = None, session=None):
+        """
+        Retrieves a client for the service and region, creating it on the first use.
+
+        Args:
+            service (str): The AWS service name, for example "ec2".
+            region (str): The AWS region of the client. None uses the session default.
+            session (boto3.Session): The session to use. None uses the default session.
+
+        Returns:
+            botocore.client.BaseClient: The shared client.
+        """
+        if session is None:
+            session = self.get_session()
+
+        key = (service, region, self.get_credentials_key(session))
+        client = self.clients.get(key)
+        if client is not None:
+            return client
+
+        # boto3 sessions are not thread safe, so clients are created one at a time
+        with self.lock:
+            if key not in self.clients:
+                client = session.client(
+                    service, region_name=region, config=self.client_config)
+                for hook in self.hooks:
+                    hook(client, key)
+                self.clients[key] = client
+            return self.clients[key]
+
+    def add_client_hook(self, hook):
+        """
+        Calls a hook for every client of the pool, the ones already created and the ones created afterwards.
+
+        Args:
+            hook (callable): Called with the client and its registry key (service, region, credentials).
+        """
+        with self.lock:
+            self.hooks.append(hook)
+            for key, client in self.clients.items():
+                hook(client, key)
+
+    def register(self, event: str, handler):
+        """
+        Registers a botocore event handler on every client of the pool.
+
+        Each client has its own copy of the session events, so the handler is registered
+        on the clients already created and on the ones created afterwards.
+
+        Args:
+            event (str): The botocore event name, for example "after-call".
+            handler (callable): The handler called by botocore.
+        """
+        self.add_client_hook(lambda client, key: client.meta.events.register(event, handler))
+
+    def clear(self):
+        """
+        Removes every client from the registry.
+        """
+        with self.lock:
+            self.clients = {}
+
+
+pool = ClientPool(
+    max_pool_connections=config["clients"]["maxPoolConnections"],
+    tcp_keepalive=config["clients"]["tcpKeepalive"],
+    max_attempts=config["scheduler"]["maxAttempts"]
+)
+
+if config["scheduler"]["enabled"]:
+    RequestScheduler(
+        rates=config["scheduler"]["rates"],
+        max_concurrency=config["scheduler"]["maxConcurrency"]
+    ).install(pool)
+
+
+def get_client(service: str, region: str = None, session=None):
+    """
+    Retrieves a shared client from the process-wide pool.
+
+    Args:
+        service (str): The AWS service name, for example "ec2".
+        region (str): The AWS region of the client.
+        session (boto3.Session): The session to use. None uses the default session.
+
+    Returns:
+        botocore.client.BaseClient: The shared client.
+    """
+    return pool.get_client(service, region, session)
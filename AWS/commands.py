@@ -1,66 +1,195 @@
 # Import necessary libraries
 
 from common import config
-from AWS.recommendations import AWSSecurityChecker, AWSCostChecker
-from AWS.commom import Account
+from AWS.recommendations import ExecutionPlan, ScanFailed
+from AWS.registry import get_checks
+from AWS.commom import Account, RegionsFinder
 import json
 
 
 #Load config file
 config = config.load_configs()
 
-def check_costs(regions, output):
+def run_checks(scope, regions, output, concurrency=config["scan"]["concurrency"], session=None, account_id=None, writer=None,
+               max_rows=None, watermarks=None, checks=None):
+    """
+    Runs the checks of a scope that are enabled on config.yml as a single execution plan.
+
+    Args:
+        scope (str): "costs", "security" or "all".
+        regions (str): A space-separated string of AWS region names, or "all".
+        output (str): The output format.
+        concurrency (int): Maximum number of steps running at the same time.
+        session (boto3.Session): The session of the scanned account. None uses the default session.
+        account_id (str): The AWS account ID. None reads it from the session.
+        writer (OutputWriter): Streams the findings of each region.
+        max_rows (int): Maximum number of findings shown per check on the table output. None uses config.yml.
+        watermarks (dict): The watermark of the previous scan by (check name, region), for incremental scans.
+        checks (list): The checks to run. None runs the checks of the scope enabled on config.yml.
+
+    Returns:
+        dict: The findings by category and check name.
+    """
+    if account_id is None:
+        account = Account(session)
+        account_id = account.get_account_id()
+
+    if checks is None:
+        checks = get_checks(scope, config)
+
+    plan = ExecutionPlan(checks, regions, account_id, output=output, concurrency=concurrency,
+                         bucket_concurrency=config["scan"]["bucketConcurrency"], session=session, writer=writer,
+                         max_rows=max_rows, watermarks=watermarks)
+    return plan.run()
+
+def check_costs(regions, output, concurrency=config["scan"]["concurrency"], session=None, account_id=None, writer=None, max_rows=None):
+    return run_checks("costs", regions, output, concurrency, session, account_id, writer, max_rows).get("costs", {})
+    
+def check_security(regions, output, concurrency=config["scan"]["concurrency"], session=None, account_id=None, writer=None, max_rows=None):
+    return run_checks("security", regions, output, concurrency, session, account_id, writer, max_rows).get("security", {})
+
+def check_all(regions, output, concurrency=config["scan"]["concurrency"], writer=None, max_rows=None):
+    from AWS.output import MultiWriter
+    from AWS.store import ResultsStore, StoreWriter
+
     account = Account()
     account_id = account.get_account_id()
-    
-    snapshot_retention = config["finders"]["aws"]["costs"]["oldSnapshots"]["daysOfRetention"]
-    aws_cost_checker = AWSCostChecker(regions, account_id, output=output)
-    
-    costs_recommendations = {}
-    
-    
-    if config["finders"]["aws"]["costs"]["gp2Volumes"] == True:
-        costs_recommendations["gp2_volumes"] = aws_cost_checker.get_gp2_volumes()
-        
-    if config["finders"]["aws"]["costs"]["volumesOnStoppedInstances"] == True:    
-        costs_recommendations["volumes_on_stopped_instances"] = aws_cost_checker.get_volumes_on_stopped_instances()
-    
-    if config["finders"]["aws"]["costs"]["detachedVolumes"] == True:
-        costs_recommendations["detached_volumes"] = aws_cost_checker.get_detached_volumes()
+    if regions == "all":
+        regions = RegionsFinder().get_available_regions()
 
-    if config["finders"]["aws"]["costs"]["detachedIps"] == True:
-        costs_recommendations["detached_ips"] = aws_cost_checker.get_detached_ips()    
-    
-    if config["finders"]["aws"]["costs"]["oldSnapshots"]["enabled"] == True:
-        costs_recommendations["old_snapshots"] = aws_cost_checker.get_old_snapshots(snapshot_retention)
+    # Findings are saved on the results store region by region, so they are not kept in memory
+    store_writer = StoreWriter(ResultsStore(config["store"]["path"]), account_id, regions)
+    writer = MultiWriter([store_writer, writer])
+
+    try:
+        recommendations = run_checks("all", regions, output, concurrency, account_id=account_id, writer=writer, max_rows=max_rows)
+    except BaseException:
+        store_writer.status = "failed"
+        raise
+    finally:
+        writer.close()
+        store_writer.store.close()
+
+    return recommendations
+
+def check_organization(targets, scope, regions, concurrency=config["scan"]["concurrency"],
+                       role_name=config["organization"]["roleName"], processes=config["organization"]["processes"]):
+    from AWS import organization
+    from AWS.findings import to_json
+
+    report = organization.scan_organization(targets, role_name, scope, regions, processes, concurrency)
+    organization.show_summary(report)
+
+    with open("org-data.json", "w") as file:
+        json.dump(report, file, indent=4, default=to_json)
+    return report
+
+
+def check_delta(regions, scope, concurrency=config["scan"]["concurrency"], max_rows=config["table"]["maxRows"], checks=None):
+    from AWS import delta
 
-    # print(json.dumps(costs_recommendations, indent=4))
-    return costs_recommendations
-    
-def check_security(regions, output):
     account = Account()
-    account_id = account.get_account_id()    
-    aws_security_checker = AWSSecurityChecker(regions, account_id, output=output)
-    
-    security_recommendations = {}
-    
-    if config["finders"]["aws"]["security"]["insecureSecurityGroups"] == True:    
-        security_recommendations["insecure_security_groups"] = aws_security_checker.get_security_groups_public_egress()
-
-    if config["finders"]["aws"]["security"]["rdsInstancePubliclyAccessible"] == True:        
-        security_recommendations["rds_instances_publicly_accessible"] = aws_security_checker.get_rds_instance_publicly_accessible()
-        
-    if config["finders"]["aws"]["security"]["s3BucketNoPublicAccessBlock"] == True:          
-        security_recommendations["s3_bucket_no_public_access_block"] = aws_security_checker.get_buckets_not_public_acess_block()
-    
-    return security_recommendations
-def check_all(regions, output):
-    recommendations = {}
-    recommendations["costs"] = check_costs(regions, output)
-    recommendations["security"] = check_security(regions, output)
-    
-    # print(json.dumps(recommendations, indent=4))
-    
-    with open("data.json", "w") as file:
-        json.dump(recommendations, file, indent=4)
-    return recommendations
\ No newline at end of file
+    account_id = account.get_account_id()
+
+    # Regions are resolved first, so only the scanned regions are compared
+    if regions == "all":
+        regions = RegionsFinder().get_available_regions()
+    elif type(regions) == str:
+        regions = list(dict.fromkeys(regions.split()))
+
+    # Checks with a watermark only scan the resources that crossed the watermark of the previous scan
+    path = config["delta"]["stateFile"]
+    if checks is None:
+        checks = get_checks(scope, config)
+    current, previous = delta.get_watermarks(path, account_id, checks, regions, config)
+
+    # Findings are not rendered, only the changes since the last scan. Checks that failed on a region
+    # keep their previous findings there, instead of reporting them as resolved
+    failure = None
+    try:
+        recommendations = run_checks(scope, regions, "delta", concurrency, account_id=account_id,
+                                     watermarks=previous, checks=checks)
+    except ScanFailed as error:
+        failure = error
+        recommendations = error.results
+
+    changes = delta.compare_scan(path, account_id, regions, recommendations, previous, current,
+                                 failure.failures if failure else None)
+    show_changes(changes, max_rows)
+
+    if failure is not None:
+        raise failure
+    return changes
+
+
+def show_changes(changes, max_rows=config["table"]["maxRows"]):
+    from AWS import delta
+    from AWS.recommendations import TableRenderer, console
+
+    if not any(changes.values()):
+        console.print("No changes since the last scan.")
+        return
+
+    renderer = TableRenderer(
+        "Changes since the last scan",
+        f"{len(changes['new'])} new, {len(changes['resolved'])} resolved and {len(changes['changed'])} changed findings.",
+        delta.DOCUMENTATION,
+        max_rows
+    )
+    renderer.add(delta.get_rows(changes))
+    renderer.show()
+
+
+def show_history(account=None, limit=20):
+    from rich.table import Table, box
+    from AWS.recommendations import console
+    from AWS.store import ResultsStore
+
+    store = ResultsStore(config["store"]["path"])
+    scans = store.get_scans(account, limit)
+    store.close()
+
+    table = Table(
+        title="[bold purple]Scan history", show_header=True, box=box.ROUNDED,
+        title_justify='left'
+    )
+    for column in ["Scan", "Account", "Started", "Finished", "Status", "Findings"]:
+        table.add_column(column)
+
+    for scan in scans:
+        table.add_row(str(scan["id"]), scan["account"], scan["started_at"], scan["finished_at"] or "-",
+                      scan["status"], str(sum(scan["finders"].values())))
+
+    console.print(table)
+    return scans
+
+
+def show_report(scan_id=None, finder=None, region=None, output="table", writer=None, max_rows=config["table"]["maxRows"]):
+    from AWS.recommendations import TableRenderer, console
+    from AWS.registry import get_check
+    from AWS.store import ResultsStore
+
+    store = ResultsStore(config["store"]["path"])
+    if scan_id is None:
+        scan_id = store.get_latest_scan()
+    if scan_id is None:
+        store.close()
+        console.print("No scans found.")
+        return None
+
+    for category, finders in store.get_finders(scan_id).items():
+        for name in finders:
+            if finder and name != finder:
+                continue
+
+            data = store.get_findings(scan_id, name, region)
+            if writer is not None:
+                writer.write((category, name), data)
+            elif output == "table":
+                check = get_check(name)
+                renderer = TableRenderer(f"{category} | {name}", None, None, max_rows, check is not None and check.savings is not None)
+                renderer.add(data)
+                renderer.show()
+
+    store.close()
+    return scan_id
@@ -1,37 +1,103 @@
-import boto3
+import hashlib
+
+from common import config
+from common.cache import MetadataCache
+from AWS.clients import get_client, pool
+
+#Load config file
+config = config.load_configs()
+
+# Cache of account metadata shared by the runs of the CLI
+metadata_cache = MetadataCache(
+    config["cache"]["path"], config["cache"]["ttl"], enabled=config["cache"]["enabled"])
+
+
+def get_cache_key(name: str, session=None):
+    """
+    Builds a cache key bound to the profile and credentials of a session.
+
+    Args:
+        name (str): The name of the cached metadata.
+        session (boto3.Session): The session used to create clients. None uses the default session.
+
+    Returns:
+        str: The cache key. The access key is hashed so it is never written to disk.
+    """
+    if session is None:
+        session = pool.get_session()
+
+    profile, access_key = pool.get_credentials_key(session)
+    credentials = hashlib.sha256(str(access_key).encode()).hexdigest()[:16]
+    return f"{name}:{profile}:{credentials}"
+
 
 class RegionsFinder:
+    def __init__(self, session=None):
+        """
+        Initializes the RegionsFinder.
+
+        Args:
+            session (boto3.Session): The session used to create clients. None uses the default session.
+        """
+        self.session = session
+
     def get_available_regions(self):
         """
         Retrieves a list of all available AWS regions.
 
+        The list is read from the metadata cache when a fresh entry exists.
+
         Returns:
             list: A list of strings containing the names of all available AWS regions.
         """
-        client = boto3.client("account")
-        response = None
+        cache_key = get_cache_key("regions", self.session)
+        regions = metadata_cache.get(cache_key)
+        if regions is not None:
+            return regions
+
+        client = get_client("account", session=self.session)
         try:
             # Get regions enabled for the account
-            response = client.list_regions(
+            paginator = client.get_paginator('list_regions')
+            pages = paginator.paginate(
                 RegionOptStatusContains=['ENABLED', 'ENABLED_BY_DEFAULT']
             )
 
+            # Extract region names from the response
+            regions = [region['RegionName'] for page in pages for region in page.get('Regions', [])]
+
         except Exception as error:
             raise error
 
-        # Extract region names from the response
-        regions = [region['RegionName'] for region in response.get('Regions', [])]
-
+        metadata_cache.set(cache_key, regions)
         return regions
     
 class Account:
+    def __init__(self, session=None):
+        """
+        Initializes the Account.
+
+        Args:
+            session (boto3.Session): The session used to create clients. None uses the default session.
+        """
+        self.session = session
+
     def get_account_id(self):
         """
         Retrieves the AWS account ID of the current user.
 
+        The ID is read from the metadata cache when a fresh entry exists.
+
         Returns:
             str: The AWS account ID.
         """
-        sts_client = boto3.client('sts')
+        cache_key = get_cache_key("account", self.session)
+        account_id = metadata_cache.get(cache_key)
+        if account_id is not None:
+            return account_id
+
+        sts_client = get_client('sts', session=self.session)
         account_id = sts_client.get_caller_identity()['Account']
-        return account_id
\ No newline at end of file
+
+        metadata_cache.set(cache_key, account_id)
+        return account_id
@@ -1,12 +1,11 @@
 # Import necessary libraries
+# The AWS modules import boto3, so they are imported inside the commands that use them
 import typer
+from contextlib import contextmanager
 from typing_extensions import Annotated
 from rich.console import Console
 from common import config
-from AWS.recommendations import AWSSecurityChecker, AWSCostChecker
-from AWS.commom import Account
-
-from AWS import commands
+from AWS.output import get_writer
 
 
 # Initialize Rich Console for better terminal output formatting
@@ -18,61 +17,298 @@ app = typer.Typer()
 #Load config file
 config = config.load_configs()
 
+
+def use_cache(no_cache: bool, refresh: bool):
+    """
+    Applies the cache switches of a command to the metadata cache.
+
+    Args:
+        no_cache (bool): Bypasses the metadata cache.
+        refresh (bool): Ignores the cached metadata and stores the new values.
+    """
+    from AWS.commom import metadata_cache
+
+    if no_cache:
+        metadata_cache.configure(enabled=False)
+    elif refresh:
+        metadata_cache.configure(enabled=metadata_cache.enabled, refresh=True)
+
+
+def start_profile(profile: bool):
+    """
+    Starts collecting the scan metrics when the --profile option is used.
+
+    Args:
+        profile (bool): The --profile option.
+    """
+    from AWS.clients import pool
+    from AWS.metrics import metrics
+
+    if profile:
+        metrics.install(pool)
+
+
+def show_profile(profile: bool):
+    """
+    Prints the scan metrics and writes them as JSON and Prometheus textfile.
+
+    Args:
+        profile (bool): The --profile option.
+    """
+    from AWS.metrics import metrics
+
+    if not profile:
+        return
+
+    # The findings may have been streamed to stdout, so the summary goes to stderr
+    metrics.show_summary(Console(stderr=True))
+    metrics.write_json(config["metrics"]["jsonFile"])
+    metrics.write_prometheus(config["metrics"]["prometheusFile"])
+
+
+def show_failures(failures: list):
+    """
+    Prints the checks that failed and on which regions.
+
+    Args:
+        failures (list): The (check name, region, error) of the failed steps.
+    """
+    from rich.table import Table, box
+
+    table = Table(title="[bold red]Failed checks", show_header=True, box=box.ROUNDED, title_justify='left')
+    for column in ["Check", "Region", "Error"]:
+        table.add_column(column)
+    for name, region, error in failures:
+        table.add_row(name, region, error)
+
+    # The findings may have been streamed to stdout, so the failures go to stderr
+    Console(stderr=True).print(table)
+
+
+@contextmanager
+def scan(profile: bool):
+    """
+    Runs a scan command: shows the profile at the end, and when some checks failed on some regions
+    shows them and exits with code 1, after the findings of the other ones.
+
+    Args:
+        profile (bool): The --profile option.
+    """
+    from AWS.recommendations import ScanFailed
+
+    try:
+        yield
+    except ScanFailed as error:
+        show_profile(profile)
+        show_failures(error.failures)
+        raise typer.Exit(code=1)
+    show_profile(profile)
+
+
 # Define a command to fetch AWS cost recommendations
 @app.command()
-def costs(regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all", output = "table"):
+def costs(regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all", output: Annotated[str, typer.Option(help='Output format: table, json, ndjson or csv.')] = "table",
+          output_file: Annotated[str, typer.Option(help='File where the json, ndjson or csv findings are written. Default: stdout.')] = None,
+          concurrency: Annotated[int, typer.Option(help='Maximum number of regions scanned at the same time.')] = config["scan"]["concurrency"],
+          no_cache: Annotated[bool, typer.Option("--no-cache", help='Do not read or write the metadata cache.')] = False,
+          refresh: Annotated[bool, typer.Option("--refresh", help='Refresh the cached regions and account identity.')] = False,
+          delta: Annotated[bool, typer.Option("--delta", help='Show only the new, resolved and changed findings since the last scan.')] = False,
+          max_rows: Annotated[int, typer.Option(help='Maximum number of findings shown per check on the table output, the highest savings first. 0 shows all of them.')] = config["table"]["maxRows"],
+          profile: Annotated[bool, typer.Option("--profile", help='Show the time of each finder and the API calls, and write them as JSON and Prometheus metrics.')] = False):
     """
     Retrieves cost recommendations for the specified AWS regions.
     """
-    commands.check_costs(regions, output)
+    from AWS import commands
+
+    use_cache(no_cache, refresh)
+    start_profile(profile)
+    with scan(profile):
+        if delta:
+            commands.check_delta(regions, "costs", concurrency, max_rows)
+        else:
+            writer = get_writer(output, output_file)
+            try:
+                commands.check_costs(regions, output, concurrency, writer=writer, max_rows=max_rows)
+            finally:
+                if writer:
+                    writer.close()
 
 
 @app.command()
-def security(regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all", output = "table"):
+def security(regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all", output: Annotated[str, typer.Option(help='Output format: table, json, ndjson or csv.')] = "table",
+             output_file: Annotated[str, typer.Option(help='File where the json, ndjson or csv findings are written. Default: stdout.')] = None,
+             concurrency: Annotated[int, typer.Option(help='Maximum number of regions scanned at the same time.')] = config["scan"]["concurrency"],
+             no_cache: Annotated[bool, typer.Option("--no-cache", help='Do not read or write the metadata cache.')] = False,
+             refresh: Annotated[bool, typer.Option("--refresh", help='Refresh the cached regions and account identity.')] = False,
+             delta: Annotated[bool, typer.Option("--delta", help='Show only the new, resolved and changed findings since the last scan.')] = False,
+             max_rows: Annotated[int, typer.Option(help='Maximum number of findings shown per check on the table output, the highest savings first. 0 shows all of them.')] = config["table"]["maxRows"],
+             profile: Annotated[bool, typer.Option("--profile", help='Show the time of each finder and the API calls, and write them as JSON and Prometheus metrics.')] = False):
     """
     Retrieves security recommendations for the specified AWS regions.
     """
-    commands.check_security(regions, output)
+    from AWS import commands
+
+    use_cache(no_cache, refresh)
+    start_profile(profile)
+    with scan(profile):
+        if delta:
+            commands.check_delta(regions, "security", concurrency, max_rows)
+        else:
+            writer = get_writer(output, output_file)
+            try:
+                commands.check_security(regions, output, concurrency, writer=writer, max_rows=max_rows)
+            finally:
+                if writer:
+                    writer.close()
     
 
 @app.command()
-def get(resource, regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all", output = "table"):
-    account = Account()
-    account_id = account.get_account_id()        
-    aws_cost_checker = AWSCostChecker(regions, account_id, output=output)
-    aws_security_checker = AWSSecurityChecker(regions, account_id, output=output)    
-    
-    match resource:
-        case "gp2-volumes":
-            aws_cost_checker.get_gp2_volumes()
-
-        case "volumes-on-stopped-instances":
-            aws_cost_checker.get_volumes_on_stopped_instances()
-
-        case "detached-volumes":
-            aws_cost_checker.get_detached_volumes()
-
-        case "detached-ips":
-            aws_cost_checker.get_detached_ips()
-
-        case "old-snapshots":
-            snapshot_retention = config["finders"]["aws"]["costs"]["oldSnapshots"]["daysOfRetention"]
-            aws_cost_checker.get_old_snapshots(snapshot_retention)
-
-        case "public-egress-rules":
-            aws_security_checker.get_security_groups_public_egress()
-            
-        case "buckets-not-public-acess-block":
-            aws_security_checker.get_buckets_not_public_acess_block()
-        
-        case "rds-publicly-accessible":
-            aws_security_checker.get_rds_instance_publicly_accessible()
-        
-        case "all-recommendations":
-            commands.check_all(regions, output)
-        
-        case _:
-            console.print("Invalid")
+def get(resource, regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all", output: Annotated[str, typer.Option(help='Output format: table, json, ndjson or csv.')] = "table",
+        output_file: Annotated[str, typer.Option(help='File where the json, ndjson or csv findings are written. Default: stdout.')] = None,
+        concurrency: Annotated[int, typer.Option(help='Maximum number of regions scanned at the same time.')] = config["scan"]["concurrency"],
+        no_cache: Annotated[bool, typer.Option("--no-cache", help='Do not read or write the metadata cache.')] = False,
+        refresh: Annotated[bool, typer.Option("--refresh", help='Refresh the cached regions and account identity.')] = False,
+        delta: Annotated[bool, typer.Option("--delta", help='Show only the new, resolved and changed findings since the last scan.')] = False,
+        max_rows: Annotated[int, typer.Option(help='Maximum number of findings shown per check on the table output, the highest savings first. 0 shows all of them.')] = config["table"]["maxRows"],
+        profile: Annotated[bool, typer.Option("--profile", help='Show the time of each finder and the API calls, and write them as JSON and Prometheus metrics.')] = False):
+    from AWS import commands
+    from AWS.commom import Account, RegionsFinder
+    from AWS.recommendations import ExecutionPlan
+    from AWS.registry import get_check
+
+    use_cache(no_cache, refresh)
+    start_profile(profile)
+
+    check = get_check(resource)
+    if check is None and resource != "all-recommendations":
+        console.print("Invalid")
+        return
+
+    with scan(profile):
+        if delta:
+            # Only the checked finder is compared, the findings of the other finders are kept on the state
+            commands.check_delta(regions, "all", concurrency, max_rows, checks=[check] if check else None)
+            return
+
+        account = Account()
+        account_id = account.get_account_id()
+
+        if regions == "all":
+            regions = RegionsFinder().get_available_regions()
+
+        writer = get_writer(output, output_file)
+        if resource == "all-recommendations":
+            commands.check_all(regions, output, concurrency, writer, max_rows)
+            return
+
+        # A single check runs through the same execution plan of the whole scan
+        plan = ExecutionPlan([check], regions, account_id, output=output, concurrency=concurrency,
+                             bucket_concurrency=config["scan"]["bucketConcurrency"], writer=writer, max_rows=max_rows)
+        try:
+            plan.run()
+        finally:
+            if writer:
+                writer.close()
+
+@app.command()
+def org(scope: Annotated[str, typer.Argument(help='What to scan on each account: costs, security or all.')] = "all",
+        accounts: Annotated[str, typer.Option(help='A string with the list of account IDs or role ARNs to scan. Exemple: "111111111111 222222222222"')] = None,
+        accounts_file: Annotated[str, typer.Option(help='A file with one account ID or role ARN per line.')] = None,
+        role_name: Annotated[str, typer.Option(help='Role assumed on each account informed by ID.')] = config["organization"]["roleName"],
+        processes: Annotated[int, typer.Option(help='Maximum number of accounts scanned at the same time.')] = config["organization"]["processes"],
+        regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all",
+        concurrency: Annotated[int, typer.Option(help='Maximum number of regions scanned at the same time.')] = config["scan"]["concurrency"]):
+    """
+    Scans many accounts of an AWS Organization and merges the results by account.
+    """
+    from AWS import commands
+    from AWS.organization import read_accounts
+
+    if scope not in ("costs", "security", "all"):
+        console.print("Invalid")
+        return
+
+    targets = read_accounts(accounts, accounts_file)
+    if not targets:
+        console.print("Inform the accounts with --accounts or --accounts-file")
+        return
+
+    report = commands.check_organization(targets, scope, regions, concurrency, role_name, processes)
+
+    # Failed accounts are shown on the summary
+    if any("error" in result for result in report.values()):
+        raise typer.Exit(code=1)
+
+@app.command()
+def serve(scope: Annotated[str, typer.Argument(help='What to scan: costs, security or all.')] = "all",
+          regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all",
+          concurrency: Annotated[int, typer.Option(help='Maximum number of regions scanned at the same time.')] = config["scan"]["concurrency"],
+          interval: Annotated[int, typer.Option(help='Seconds between the end of a scan and the start of the next one.')] = config["serve"]["interval"],
+          host: Annotated[str, typer.Option(help='Address the HTTP API listens on.')] = config["serve"]["host"],
+          port: Annotated[int, typer.Option(help='Port the HTTP API listens on.')] = config["serve"]["port"]):
+    """
+    Stays resident, re-scans on a schedule and serves the latest findings over a local HTTP/JSON API.
+    """
+    from AWS import recommendations
+    from AWS.commom import Account, RegionsFinder
+    from AWS.server import ScanState, Watcher, serve as serve_api
+
+    if scope not in ("costs", "security", "all"):
+        console.print("Invalid")
+        return
+
+    # Account and regions are resolved once, clients stay warm between the scans
+    account_id = Account().get_account_id()
+    if regions == "all":
+        regions = RegionsFinder().get_available_regions()
+    elif type(regions) == str:
+        regions = list(dict.fromkeys(regions.split()))
+
+    # Scans run in background, only the API address is printed
+    recommendations.console.quiet = True
+
+    state = ScanState(account_id, regions, scope, interval)
+    console.print(f"Serving the findings of account {account_id} on http://{host}:{port} (scan every {interval}s). Press Ctrl+C to stop.")
+    serve_api(state, Watcher(state, concurrency), host, port)
+
+@app.command()
+def history(account: Annotated[str, typer.Option(help='Only scans of this account.')] = None,
+            limit: Annotated[int, typer.Option(help='Maximum number of scans listed.')] = 20):
+    """
+    Lists the scans saved on the results store.
+    """
+    from AWS import commands
+
+    commands.show_history(account, limit)
+
+@app.command()
+def report(scan_id: Annotated[int, typer.Option(help='The scan to show. Default: the latest scan.')] = None,
+           finder: Annotated[str, typer.Option(help='Only findings of this finder. Exemple: gp2_volumes')] = None,
+           regions: Annotated[str, typer.Option(help='Only findings of this region. Exemple: "us-east-1"')] = None,
+           output: Annotated[str, typer.Option(help='Output format: table, json, ndjson or csv.')] = "table",
+           output_file: Annotated[str, typer.Option(help='File where the json, ndjson or csv findings are written. Default: stdout.')] = None,
+           max_rows: Annotated[int, typer.Option(help='Maximum number of findings shown per finder on the table output, the highest savings first. 0 shows all of them.')] = config["table"]["maxRows"]):
+    """
+    Shows the findings of a scan saved on the results store.
+    """
+    from AWS import commands
+
+    writer = get_writer(output, output_file)
+    try:
+        commands.show_report(scan_id, finder, regions, output, writer, max_rows)
+    finally:
+        if writer:
+            writer.close()
+
+@app.command()
+def clear_cache():
+    """
+    Removes the cached regions and account identity.
+    """
+    from AWS.commom import metadata_cache
+
+    metadata_cache.invalidate()
+    console.print("Cache cleared!")
 
 @app.command()
 def fix(regions: Annotated[str, typer.Option(help='A string with the list of regions to scan. Exemple: "us-east-1 us-east-2 sa-east-1"')] = "all",
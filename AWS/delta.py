@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import time
+
+from datetime import date
+from utils.logger import log
+from AWS.registry import CHECKS
+from AWS.findings import Finding, to_dict
+
+# Attribute that identifies the resource of each finder
+RESOURCE_IDS = {check.name: check.resource_id for check in CHECKS}
+
+# Finders that scan the whole account instead of a list of regions
+GLOBAL_FINDERS = [check.name for check in CHECKS if check.scope == "account"]
+
+# Attributes compared between scans to report a finding as changed, by finder
+COMPARED_ATTRIBUTES = {check.name: check.compared for check in CHECKS if check.compared}
+
+# Attributes that are not compared for the finders without compared attributes
+IGNORED_ATTRIBUTES = ["MonthlySavings", "StoppedDays"]
+
+# Version of the attribute hashes, the findings saved with other versions are hashed again
+FINGERPRINT_VERSION = 2
+
+# Shown as the documentation of the changes table
+DOCUMENTATION = ("New findings were not reported by the last scan, resolved findings are no longer reported and "
+                 "changed findings have different attributes. Run the command without --delta for every finding.")
+
+
+def get_region(finding: dict):
+    """
+    Retrieves the region of a finding. Records have a region field, while the findings saved as
+    dictionaries use both "Region" and "region".
+
+    Args:
+        finding (Finding | dict): The finding.
+
+    Returns:
+        str: The region of the finding.
+    """
+    if isinstance(finding, Finding):
+        return finding.region
+    return finding.get("Region", finding.get("region", ""))
+
+
+def fingerprint(account: str, finder: str, finding: dict):
+    """
+    Builds the fingerprint of a finding.
+
+    Args:
+        account (str): The AWS account ID.
+        finder (str): The finder that reported the finding, for example "gp2_volumes".
+        finding (dict): The finding, as a dictionary.
+
+    Returns:
+        tuple: The key that identifies the resource and the hash of its attributes.
+    """
+    resource = finding.get(RESOURCE_IDS.get(finder), "")
+    key = "|".join([account, get_region(finding), finder, str(resource)])
+    # Only the state of the resource is compared, estimates change with the price table and ages with the clock
+    if finder in COMPARED_ATTRIBUTES:
+        attributes = {name: finding.get(name) for name in COMPARED_ATTRIBUTES[finder]}
+    else:
+        attributes = {name: value for name, value in finding.items() if name not in IGNORED_ATTRIBUTES}
+    attributes = hashlib.sha1(json.dumps(attributes, sort_keys=True, default=str).encode()).hexdigest()
+    return key, attributes
+
+
+def load_state(path: str):
+    """
+    Loads the findings of the previous scans.
+
+    Args:
+        path (str): The state file.
+
+    Returns:
+        dict: The previous scan of each account.
+    """
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path: str, state: dict):
+    """
+    Writes the findings of the scans atomically.
+
+    Args:
+        path (str): The state file.
+        state (dict): The last scan of each account.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+def get_watermarks(path: str, account: str, checks: list, regions: list, config: dict):
+    """
+    Retrieves the watermarks of the checks that can scan incrementally.
+
+    A (check, region) is scanned incrementally when its previous scan reached a watermark and its
+    last full scan is more recent than delta.fullScanDays. A watermark that moved back, for example
+    because the retention grew, needs a full scan.
+
+    Args:
+        path (str): The state file.
+        account (str): The AWS account ID.
+        checks (list): The checks of the scan.
+        regions (list): The regions scanned.
+        config (dict): The loaded config.
+
+    Returns:
+        tuple: The watermark reached now by check name, and the watermark of the previous scan by
+            (check name, region) for the pairs scanned incrementally.
+    """
+    current = {check.name: check.watermark(config) for check in checks if check.watermark is not None}
+
+    full_scan = config["delta"].get("fullScanDays", 0) * 86400
+    watermarks = load_state(path).get(account, {}).get("watermarks", {})
+    previous = {}
+    for name, watermark in current.items():
+        for region in regions:
+            mark = watermarks.get(name, {}).get(region)
+            if not mark or time.time() - mark["full"] >= full_scan:
+                continue
+            since = date.fromisoformat(mark["date"])
+            if since <= watermark:
+                previous[(name, region)] = since
+    return current, previous
+
+
+def compare_scan(path: str, account: str, regions: list, recommendations: dict, incremental: dict = None,
+                 watermarks: dict = None, failures: list = None):
+    """
+    Compares a scan with the previous scan of the account and stores it as the new baseline.
+
+    Only the finders and regions scanned now are compared, so a partial scan never
+    reports the findings of other finders or regions as resolved. Findings of the pairs
+    scanned incrementally, or whose scan failed, are never resolved either, they were not
+    described again.
+
+    Args:
+        path (str): The state file.
+        account (str): The AWS account ID.
+        regions (list): The regions scanned.
+        recommendations (dict): The findings of the scan, grouped by category and finder.
+        incremental (dict): The watermark of the previous scan by (finder, region), for the pairs scanned incrementally.
+        watermarks (dict): The watermark reached by this scan, by finder.
+        failures (list): The (finder, region, error) of the failed steps. The region of the global finders is "global".
+
+    Returns:
+        dict: Lists of "new", "resolved" and "changed" findings.
+    """
+    incremental = incremental or {}
+    failed = {(finder, region) for finder, region, error in failures or []}
+    state = load_state(path)
+    previous = state.get(account, {}).get("findings", {})
+    if state.get(account, {}).get("version") != FINGERPRINT_VERSION:
+        for entry in previous.values():
+            entry["hash"] = fingerprint(account, entry["finder"], entry["finding"])[1]
+
+    current = {}
+    finders = set()
+    for category in recommendations.values():
+        for finder, findings in category.items():
+            finders.add(finder)
+            for finding in findings:
+                # The state is saved as JSON, so the records are converted here
+                finding = to_dict(finding)
+                key, attributes = fingerprint(account, finder, finding)
+                current[key] = {"finder": finder, "hash": attributes, "finding": finding}
+
+    changes = {"new": [], "resolved": [], "changed": []}
+    for key, entry in current.items():
+        if key not in previous:
+            changes["new"].append(entry)
+        elif previous[key]["hash"] != entry["hash"]:
+            changes["changed"].append(entry)
+
+    resolved = set()
+    for key, entry in previous.items():
+        if key in current or entry["finder"] not in finders:
+            continue
+        if (entry["finder"], get_region(entry["finding"])) in incremental:
+            continue
+        if (entry["finder"], "global" if entry["finder"] in GLOBAL_FINDERS else get_region(entry["finding"])) in failed:
+            continue
+        if entry["finder"] in GLOBAL_FINDERS or get_region(entry["finding"]) in regions:
+            resolved.add(key)
+            changes["resolved"].append(entry)
+
+    # Findings of finders or regions not scanned now are kept for the next comparison
+    baseline = {key: entry for key, entry in previous.items() if key not in resolved}
+    baseline.update(current)
+
+    # The last full scan is kept for the pairs scanned incrementally
+    marks = state.get(account, {}).get("watermarks", {})
+    for finder, watermark in (watermarks or {}).items():
+        for region in regions:
+            # A failed scan keeps the previous watermark
+            if (finder, region) in failed:
+                continue
+            full = marks.get(finder, {}).get(region, {}).get("full") if (finder, region) in incremental else time.time()
+            marks.setdefault(finder, {})[region] = {"date": watermark.isoformat(), "full": full}
+
+    state[account] = {"time": time.time(), "version": FINGERPRINT_VERSION, "findings": baseline, "watermarks": marks}
+    save_state(path, state)
+
+    log.info(f"Account: {account} | Delta: {len(changes['new'])} new, "
+             f"{len(changes['resolved'])} resolved, {len(changes['changed'])} changed")
+    return changes
+
+
+def get_rows(changes: dict):
+    """
+    Flattens the changes into table rows.
+
+    Args:
+        changes (dict): Lists of "new", "resolved" and "changed" findings.
+
+    Returns:
+        list: One dictionary per change.
+    """
+    rows = []
+    for change, entries in changes.items():
+        for entry in entries:
+            rows.append({
+                "Change": change.capitalize(),
+                "Finder": entry["finder"],
+                "Region": get_region(entry["finding"]) or "-",
+                "Resource": str(entry["finding"].get(RESOURCE_IDS.get(entry["finder"]), "-"))
+            })
+    return rows
@@ -1,11 +1,83 @@
 import datetime
-import boto3
-import sys
+import re
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+from utils.logger import log
+from AWS.clients import get_client
+from AWS.inventory import EC2Inventory
+from AWS.scheduler import THROTTLING_ERRORS
+from AWS.query import Query, Equals, Missing, Before, Between, MAX_FILTER_VALUES
+from AWS.findings import GP2Volume, StoppedInstanceVolume, DetachedVolume, DetachedAddress, OldSnapshot, \
+    LineageSnapshot, ExposedGroup, PublicDBInstance, PublicBucket
+from AWS.rules import SecurityGroupPolicy
+from common import config
 
+#Load config file
+config = config.load_configs()
 
-class EC2Finder:
+# Options that must be enabled for a public access block to block everything
+PUBLIC_ACCESS_BLOCK_OPTIONS = ["BlockPublicAcls", "IgnorePublicAcls", "BlockPublicPolicy", "RestrictPublicBuckets"]
+
+# VolumeId of the snapshots that were copied or created from an AMI, their source volume is unknown
+UNKNOWN_VOLUME = "vol-ffffffff"
+
+# Stop time on the StateTransitionReason of a stopped instance, for example "User initiated (2024-01-31 12:00:00 GMT)"
+STOP_TIME = re.compile(r"\((\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) GMT\)")
+
+
+def get_stop_time(instance: dict):
+    """
+    Parses the time an instance was stopped from its StateTransitionReason.
+
+    Args:
+        instance (dict): The instance as returned by DescribeInstances.
+
+    Returns:
+        datetime: The stop time in UTC, or None when the reason has no time.
+    """
+    match = STOP_TIME.search(instance.get("StateTransitionReason") or "")
+    if match is None:
+        return None
+    return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+class Finder:
+    def __init__(self, session=None):
+        """
+        Initializes the finder.
+
+        Args:
+            session (boto3.Session): The session used to create clients. None uses the default session.
+        """
+        self.session = session
+        self.push_down = config["query"]["pushDown"]
+
+    def query(self, collection: str, *predicates):
+        """
+        Builds a query on a collection, pushing the predicates down to the API when enabled on config.yml.
+
+        Args:
+            collection (str): The collection name, for example "volumes".
+            *predicates: The predicates, all of them must match.
+
+        Returns:
+            Query: The query.
+        """
+        return Query(collection, *predicates, push_down=self.push_down)
+
+
+class EC2Finder(Finder):
+    def __init__(self, session=None):
+        """
+        Initializes the EC2Finder with an empty inventory shared by all its finders.
+
+        Args:
+            session (boto3.Session): The session used to create clients. None uses the default session.
+        """
+        super().__init__(session)
+        self.inventory = EC2Inventory(session)
 
     def get_gp2_volumes(self, region: str):
         """
@@ -15,75 +87,80 @@ class EC2Finder:
             region (str): The AWS region to retrieve the GP2 volumes from.
 
         Returns:
-            list: A list of dictionaries containing information about the GP2 volumes.
+            generator: GP2Volume records.
         """
-        client = boto3.client('ec2', region_name=region)
-
         try:
-
-            response = client.describe_volumes(
-                Filters=[
-                    {
-                        "Name": 'volume-type',
-                        "Values": ["gp2"]
-                    }
-                ]
-            )
-
-            return [
-                {
-                    'Region': region,
-                    'VolumeId': volume['VolumeId'],
-                    'VolumeType': volume['VolumeType']
-                }
-                for volume in response.get('Volumes')
-            ]
+            # The filter is pushed down, unless the volumes are shared with other finders through the inventory
+            query = self.query("volumes", Equals("VolumeType", "gp2"))
+            for volume in self.inventory.get_volumes(region, query).values():
+                yield GP2Volume(region, volume['VolumeId'], volume['VolumeType'], str(volume['Size']))
 
         except Exception as e:
-            print(f"Error retrieving GP2 volumes in {region}: {e}")
-            sys.exit()
+            log.error(f"Error retrieving GP2 volumes in {region}: {e}")
+            raise
 
-    def get_volumes_on_stopped_instances(self, region: str):
+    def get_volumes_by_id(self, region: str, volume_ids):
         """
-        Retrieves information about all volumes attached to stopped instances in the specified AWS region.
+        Retrieves the volumes with the given ids, with one batched DescribeVolumes per chunk of ids
+        instead of one call per volume. Shared volumes are read from the inventory.
 
         Args:
-            region (str): The AWS region to retrieve the volumes from.
+            region (str): The AWS region of the volumes.
+            volume_ids (iterable): The volume ids.
 
         Returns:
-            list: A list of dictionaries containing information about the volumes.
+            dict: The volumes found, indexed by VolumeId.
         """
-        # Initialize EC2 client for the specified region
-        client = boto3.client('ec2', region_name=region)
+        volume_ids = sorted(set(volume_ids))
+        if "volumes" in self.inventory.shared or not self.push_down:
+            volumes = self.inventory.get_volumes(region)
+            return {volume_id: volumes[volume_id] for volume_id in volume_ids if volume_id in volumes}
+
+        volumes = {}
+        for index in range(0, len(volume_ids), MAX_FILTER_VALUES):
+            query = self.query("volumes", Equals("VolumeId", *volume_ids[index:index + MAX_FILTER_VALUES]))
+            volumes.update(self.inventory.get_volumes(region, query))
+        return volumes
+
+    def get_volumes_on_stopped_instances(self, region: str, min_days: int = 0):
+        """
+        Retrieves information about all volumes attached to stopped instances in the specified AWS region,
+        joined with the size and type of each volume.
 
+        Args:
+            region (str): The AWS region to retrieve the volumes from.
+            min_days (int): Instances stopped for fewer days are skipped. Instances whose stop time is unknown are kept.
+
+        Returns:
+            generator: StoppedInstanceVolume records, one per volume.
+        """
         try:
-            # Get stopped instances
-            response = client.describe_instances(
-                Filters=[
-                    {
-                        'Name': 'instance-state-name',
-                        'Values': ['stopped']
-                    }
-                ]
-            )
+            now = datetime.now(timezone.utc)
+            query = self.query("instances", Equals("State.Name", "stopped"))
+
+            devices = []
+            for instance in self.inventory.get_instances(region, query).values():
+                stopped_at = get_stop_time(instance)
+                days = (now - stopped_at).days if stopped_at else None
+                if days is not None and days < min_days:
+                    continue
+                # Instance store volumes have no Ebs mapping and are not charged while stopped
+                for device in instance.get("BlockDeviceMappings", []):
+                    if "Ebs" in device:
+                        devices.append((instance["InstanceId"], device, stopped_at, days))
 
-            # relevant information for each volume
-            volumes = []
-            for reservation in response.get("Reservations"):
-                for instance in reservation["Instances"]:
-                    for device in instance["BlockDeviceMappings"]:
-                        volumes.append({
-                            "region": region,
-                            "instance": instance["InstanceId"],
-                            "device": device["DeviceName"],
-                            "volume": device["Ebs"]["VolumeId"]
-                        })
-            return volumes
+            volumes = self.get_volumes_by_id(region, (device["Ebs"]["VolumeId"] for _, device, _, _ in devices))
+
+            for instance_id, device, stopped_at, days in devices:
+                volume_id = device["Ebs"]["VolumeId"]
+                volume = volumes.get(volume_id, {})
+                yield StoppedInstanceVolume(region, instance_id, device["DeviceName"], volume_id,
+                                            volume.get("VolumeType"), str(volume["Size"]) if "Size" in volume else None,
+                                            stopped_at.strftime("%Y-%m-%d %H:%M:%S") if stopped_at else None, days)
 
         except Exception as e:
-            print(
-                f"Error retrieving volumes on stopped instances in {region}: {e}")
-            sys.exit()
+            log.error(f"Error retrieving volumes on stopped instances in {region}: {e}")
+            raise
 
     def get_detached_volumes(self, region: str):
         """
@@ -93,31 +170,17 @@ class EC2Finder:
             region (str): The AWS region to retrieve the detached volumes from.
 
         Returns:
-            list: A list of dictionaries containing information about the detached volumes.
+            generator: DetachedVolume records.
         """
-        # Initialize EC2 client for the specified region
-        client = boto3.client('ec2', region_name=region)
-
         try:
-            # Get all volumes
-            response = client.describe_volumes()
-
             # relevant information for each volume
-            volumes = []
-            for volume in response.get("Volumes"):
-                if volume["State"] == "available":
-                    volumes.append({
-                        "region": region,
-                        "volume": volume["VolumeId"],
-                        "AvailabilityZone": volume["AvailabilityZone"],
-                        "VolumeType": volume["VolumeType"],
-                        "Size": str(volume["Size"])
-                    })
-            return volumes
+            query = self.query("volumes", Equals("State", "available"))
+            for volume in self.inventory.get_volumes(region, query).values():
+                yield DetachedVolume(region, volume["VolumeId"], volume["AvailabilityZone"], volume["VolumeType"], str(volume["Size"]))
 
         except Exception as e:
-            print(f"Error retrieving detached volumes in {region}: {e}")
-            sys.exit()
+            log.error(f"Error retrieving detached volumes in {region}: {e}")
+            raise
 
     def get_detached_ips(self, region: str):
         """
@@ -127,104 +190,168 @@ class EC2Finder:
             region (str): The AWS region to retrieve the detached IP addresses from.
 
         Returns:
-            list: A list of dictionaries containing information about the detached IP addresses.
+            generator: DetachedAddress records.
         """
         # Initialize EC2 client for the specified region
-        client = boto3.client('ec2', region_name=region)
+        client = get_client('ec2', region, self.session)
 
         try:
-            # Get all IP addresses
-            response = client.describe_addresses()
+            # No filter selects unassociated addresses, so that predicate is checked on the client
+            query = self.query("addresses", Missing("NetworkInterfaceId"))
+
+            # Get the IP addresses (DescribeAddresses is not paginated)
+            response = client.describe_addresses(**query.get_params())
 
             # Extract relevant information for each unused Elastic IPs
-            not_used_ips = []
             for address in response.get('Addresses', []):
-                # Check if Elastic IP is not associated with any network interface
-                if "NetworkInterfaceId" not in address and address is not None:
-                    not_used_ips.append({
-                        "Region": region,
-                        "Address": address['PublicIp'],
-                        "AllocationId": address['AllocationId']
-                    })
-
-            return not_used_ips
+                if query.matches(address):
+                    yield DetachedAddress(region, address['PublicIp'], address['AllocationId'])
         except Exception as e:
-            print(f"Error retrieving detached IP addresses in {region}: {e}")
+            log.error(f"Error retrieving detached IP addresses in {region}: {e}")
+            raise
 
-    def get_old_snapshots(self, region: str, retention):
+    def get_old_snapshots(self, region: str, retention, since=None):
         """
         Retrieves information about all old snapshots in the specified AWS region.
 
         Args:
             region (str): The AWS region to retrieve the old snapshots from.
+            retention (int): Snapshots older than this number of days are old.
+            since (date): The retention limit of the previous scan. Only the snapshots that became old
+                after it are retrieved, None retrieves all of them.
 
         Returns:
-            list: A list of dictionaries containing information about the old snapshots.
+            generator: OldSnapshot records.
         """
         # Initialize EC2 client for the specified region
-        client = boto3.client('ec2', region_name=region)
+        client = get_client('ec2', region, self.session)
 
         try:
-            # Get all snapshots
-            response = client.describe_snapshots(
-                OwnerIds=['self'])
+            # Snapshot times are in UTC, so is the limit
+            limit = datetime.now(timezone.utc).date() - timedelta(days=retention)
+            if since is None:
+                query = self.query("snapshots", Before("StartTime", limit))
+            elif since >= limit:
+                # No snapshot became old since the previous scan
+                return
+            else:
+                query = self.query("snapshots", Between("StartTime", since, limit))
+
+            # The snapshots are read from the inventory when the lineage analysis also needs them,
+            # otherwise they are streamed page by page
+            if "snapshots" in self.inventory.shared:
+                pages = [{"Snapshots": self.inventory.get_snapshots(region, query).values()}]
+            else:
+                paginator = client.get_paginator('describe_snapshots')
+                pages = paginator.paginate(OwnerIds=['self'], **query.get_params())
 
             # Extract relevant information for each old snapshot
-            old_snapshots = []
-            for snapshot in response.get('Snapshots', []):
-                # Check if snapshot is older
-                if snapshot['StartTime'].date() < datetime.now().date() - timedelta(days=retention):
-                    old_snapshots.append({
-                        "Region": region,
-                        "SnapshotId": snapshot['SnapshotId'],
-                        "StartTime": str(snapshot['StartTime'].date())
-                    })
-
-            return old_snapshots
+            for page in pages:
+                for snapshot in page.get('Snapshots', []):
+                    if query.matches(snapshot):
+                        yield OldSnapshot(region, snapshot['SnapshotId'], str(snapshot['StartTime'].date()), str(snapshot.get('VolumeSize', 0)))
 
         except Exception as e:
-            print(f"Error retrieving old snapshots in {region}: {e}")
-            sys.exit()
+            log.error(f"Error retrieving old snapshots in {region}: {e}")
+            raise
 
-    def get_security_groups_public_egress(self, region: str):
+    def get_snapshot_lineage(self, region: str, keep: int):
         """
-        Retrieves information about all public egress rules in the specified AWS region.
+        Retrieves the orphaned and superseded snapshots in the specified AWS region.
+
+        Snapshots, volumes and AMIs are joined through hash indexes on VolumeId and SnapshotId,
+        in a single pass over the snapshots. A snapshot is orphaned when its source volume no
+        longer exists, and superseded when its volume has at least "keep" newer snapshots.
+        Snapshots that back an AMI are never reported.
 
         Args:
-            region (str): The AWS region to retrieve the public egress rules from.
+            region (str): The AWS region to retrieve the snapshots from.
+            keep (int): Most recent snapshots kept per source volume.
 
         Returns:
-            list: A list of dictionaries containing information about the public egress rules.
+            generator: LineageSnapshot records.
         """
-        # Initialize EC2 client for the specified region
-        client = boto3.client('ec2', region_name=region)
+        try:
+            snapshots = self.inventory.get_snapshots(region, self.query("snapshots", Equals("State", "completed")))
+            volumes = self.inventory.get_volumes(region)
+            images = self.inventory.get_images(region)
+
+            # Index of the snapshots used by the AMIs
+            image_snapshots = {
+                mapping["Ebs"]["SnapshotId"]
+                for image in images.values()
+                for mapping in image.get("BlockDeviceMappings", [])
+                if mapping.get("Ebs", {}).get("SnapshotId")
+            }
+
+            # Snapshots grouped by their source volume
+            lineage = {}
+            for snapshot in snapshots.values():
+                volume_id = snapshot.get("VolumeId")
+                if snapshot["SnapshotId"] in image_snapshots or not volume_id or volume_id == UNKNOWN_VOLUME:
+                    continue
+                lineage.setdefault(volume_id, []).append(snapshot)
+
+            for volume_id, chain in lineage.items():
+                if volume_id not in volumes:
+                    status, superseded = "Orphaned", chain
+                elif len(chain) > keep:
+                    chain.sort(key=lambda snapshot: snapshot["StartTime"], reverse=True)
+                    status, superseded = "Superseded", chain[keep:]
+                else:
+                    continue
+
+                for snapshot in superseded:
+                    yield LineageSnapshot(region, snapshot["SnapshotId"], volume_id, str(snapshot["StartTime"].date()),
+                                          str(snapshot.get("VolumeSize", 0)), status)
 
+        except Exception as e:
+            log.error(f"Error retrieving the snapshot lineage in {region}: {e}")
+            raise
+
+    def get_security_groups_public_egress(self, region: str, policy: dict = None):
+        """
+        Retrieves the security groups exposed to the internet or to broad ranges in the specified AWS region.
+
+        Every group is fetched once and its ingress and egress rules are evaluated by the rule
+        engine. The network interfaces are indexed by group, so each finding tells how many
+        interfaces use the group.
+
+        Args:
+            region (str): The AWS region to retrieve the security groups from.
+            policy (dict): The securityGroups section of config.yml. None reads it from config.yml.
+
+        Returns:
+            generator: ExposedGroup records.
+        """
         try:
+            policy = SecurityGroupPolicy(policy if policy is not None else config["securityGroups"])
+            groups = self.inventory.get_security_groups(region)
+
+            # Number of network interfaces of each group
+            interfaces = {}
+            for interface in self.inventory.get_network_interfaces(region).values():
+                for group in interface.get("Groups", []):
+                    interfaces[group["GroupId"]] = interfaces.get(group["GroupId"], 0) + 1
+
+            for group in groups.values():
+                attached = interfaces.get(group["GroupId"], 0)
+                if policy.attached_only and not attached:
+                    continue
+
+                result = policy.evaluate(group)
+                if result is None:
+                    continue
 
-            # Describe security groups with IP permission CIDR as "0.0.0.0/0" (internet access)
-            response = client.describe_security_groups(Filters=[
-                {
-                    "Name": "ip-permission.cidr",
-                    "Values": ["0.0.0.0/0"]
-                }
-            ])
-
-            # Extract relevant information for each security group
-            security_groups = []
-            for item in response["SecurityGroups"]:
-                security_groups.append({
-                    "Region": region,
-                    "GroupId": item['GroupId'],
-                    "GroupName": item["GroupName"],
-                    "VpcId": item["VpcId"]
-                })
-
-            return security_groups
+                severity, exposures = result
+                yield ExposedGroup(region, group["GroupId"], group.get("GroupName"), group.get("VpcId", "-"),
+                                   severity, "; ".join(exposures), attached)
 
         except Exception as e:
-            print(f"Error retrieving public egress rules in {region}: {e}")
+            log.error(f"Error retrieving exposed security groups in {region}: {e}")
+            raise
 
-class RDSFinder:
+class RDSFinder(Finder):
     def get_rds_instance_publicly_accessible(self, region: str):
         """
         Retrieves information about all RDS instances that are publicly accessible in the specified AWS region.
@@ -233,63 +360,166 @@ class RDSFinder:
             region (str): The AWS region to retrieve the RDS instances from.
 
         Returns:
-            list: A list of dictionaries containing information about the RDS instances.
+            generator: PublicDBInstance records.
         """
-        client = boto3.client("rds", region_name=region)
+        client = get_client("rds", region, self.session)
         try:
-            # Describe RDS instances
-            response = client.describe_db_instances()
-            db_instances = []
+            # DescribeDBInstances has no filter for public access, so it is checked on the client
+            query = self.query("db_instances", Equals("PubliclyAccessible", True))
+
+            # Describe RDS instances, page by page
+            paginator = client.get_paginator('describe_db_instances')
 
             # Extract RDS instances that are publicly accessible
-            for instance in response["DBInstances"]:
-                if instance["PubliclyAccessible"] == True:
-                    db_instances.append({
-                        "Region": region,
-                        "DBInstanceIdentifier": instance["DBInstanceIdentifier"],
-                        "PubliclyAccessible": str(instance["PubliclyAccessible"])
-                    })
-
-            return db_instances        
+            for page in paginator.paginate(**query.get_params()):
+                for instance in page.get("DBInstances", []):
+                    if query.matches(instance):
+                        yield PublicDBInstance(region, instance["DBInstanceIdentifier"], str(instance["PubliclyAccessible"]))
         except Exception as e:
-            print(f"Error retrieving RDS instances in {region}: {e}")
-class S3Finder:
-    def get_buckets_not_public_acess_block(self):
+            log.error(f"Error retrieving RDS instances in {region}: {e}")
+            raise
+
+
+class S3Finder(Finder):
+    def __init__(self, session=None, concurrency=1):
+        """
+        Initializes the S3Finder.
+
+        Args:
+            session (boto3.Session): The session used to create clients. None uses the default session.
+            concurrency (int): Maximum number of buckets checked at the same time.
         """
-        Retrieves information about all buckets that do not have public access block enabled in the specified AWS region.
+        super().__init__(session)
+        self.concurrency = max(1, int(concurrency))
+
+    def get_account_public_access_block(self, account: str):
+        """
+        Checks if the account-level public access block blocks every kind of public access.
 
         Args:
-            region (str): The AWS region to retrieve the buckets from.
+            account (str): The AWS account ID.
 
         Returns:
-            list: A list of dictionaries containing information about the buckets.
+            bool: True when all the account-level public access block options are enabled.
         """
-        # Initialize S3 client for the specified region
-        client = boto3.client('s3')
+        client = get_client('s3control', 'us-east-1', self.session)
+        try:
+            response = client.get_public_access_block(AccountId=account)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchPublicAccessBlockConfiguration":
+                log.warning(f"Account: {account} | Unable to read the account public access block: {e}")
+            return False
+
+        configuration = response["PublicAccessBlockConfiguration"]
+        return all(configuration.get(option, False) for option in PUBLIC_ACCESS_BLOCK_OPTIONS)
 
+    def get_bucket_region(self, bucket: dict):
+        """
+        Retrieves the home region of a bucket.
+
+        Args:
+            bucket (dict): The bucket as returned by ListBuckets.
+
+        Returns:
+            str: The region of the bucket, or None when the location can not be read.
+        """
+        # Recent versions of ListBuckets already return the bucket region
+        if bucket.get("BucketRegion"):
+            return bucket["BucketRegion"]
+
+        client = get_client('s3', session=self.session)
         try:
-            # Get all buckets
-            response = client.list_buckets()
-
-            # Extract relevant information for each bucket
-            buckets = []
-            public_buckets = []
-            
-            for bucket in response["Buckets"]:
-                buckets.append(bucket["Name"])
-
-            for bucket in buckets:
-                try:
-                    client.get_public_access_block(
-                        Bucket=bucket
-                    )
-                    continue
-                except:
-                    public_buckets.append({"Bucket": bucket, "Public": "True"})
+            location = client.get_bucket_location(Bucket=bucket["Name"]).get("LocationConstraint")
+        except ClientError as e:
+            log.warning(f"Bucket: {bucket['Name']} | Error retrieving the bucket location: {e}")
+            return None
+
+        # Buckets on us-east-1 have no location constraint and "EU" is the legacy name of eu-west-1
+        if not location:
+            return "us-east-1"
+        if location == "EU":
+            return "eu-west-1"
+        return location
+
+    def check_bucket_public_access_block(self, bucket: str, region: str):
+        """
+        Checks the public access block of a bucket using a client on the bucket region.
+
+        Args:
+            bucket (str): The bucket name.
+            region (str): The home region of the bucket.
 
-            return public_buckets
+        Returns:
+            PublicBucket: The bucket when it is not fully blocked, otherwise None.
+        """
+        client = get_client('s3', region, self.session)
+        try:
+            response = client.get_public_access_block(Bucket=bucket)
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code == "NoSuchPublicAccessBlockConfiguration":
+                return PublicBucket(bucket, region, "True", "No configuration")
+
+            # Throttles are retried by botocore, so reaching here means the retries are exhausted
+            if code in THROTTLING_ERRORS:
+                log.warning(f"Bucket: {bucket} | Throttled checking the public access block: {e}")
+                return PublicBucket(bucket, region, "Unknown", "Throttled")
+
+            log.warning(f"Bucket: {bucket} | Error checking the public access block: {e}")
+            return PublicBucket(bucket, region, "Unknown", f"Error ({code})")
+
+        configuration = response["PublicAccessBlockConfiguration"]
+        if all(configuration.get(option, False) for option in PUBLIC_ACCESS_BLOCK_OPTIONS):
+            return None
+        return PublicBucket(bucket, region, "True", "Partially blocked")
+
+    def get_buckets_not_public_acess_block(self, account: str = None):
+        """
+        Retrieves information about all buckets that do not have public access block enabled.
+
+        Buckets are grouped by their home region and checked by a bounded thread pool
+        using regional clients. When the account-level public access block already
+        blocks everything, no bucket is checked.
+
+        Args:
+            account (str): The AWS account ID, used to check the account-level public access block.
+
+        Returns:
+            generator: PublicBucket records.
+        """
+        # Initialize S3 client for the specified region
+        client = get_client('s3', session=self.session)
+
+        try:
+            if account and self.get_account_public_access_block(account):
+                log.info(f"Account: {account} | Account public access block covers all buckets")
+                return
+
+            # Get all buckets, page by page when the API supports pagination
+            if client.can_paginate('list_buckets'):
+                pages = client.get_paginator('list_buckets').paginate()
+            else:
+                pages = [client.list_buckets()]
+
+            buckets = [bucket for page in pages for bucket in page.get("Buckets", [])]
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                # Group buckets by their home region
+                buckets_by_region = {}
+                for bucket, region in zip(buckets, executor.map(self.get_bucket_region, buckets)):
+                    # A bucket whose location can not be read is reported, the other ones are still checked
+                    if region is None:
+                        yield PublicBucket(bucket["Name"], "unknown", "Unknown", "Error (GetBucketLocation)")
+                        continue
+                    buckets_by_region.setdefault(region, []).append(bucket["Name"])
+
+                for region, names in buckets_by_region.items():
+                    results = executor.map(
+                        lambda name: self.check_bucket_public_access_block(name, region), names)
+                    for result in results:
+                        if result:
+                            yield result
 
         except Exception as e:
-            print(f"Error retrieving buckets not public access block in {region}: {e}")
-            sys.exit()
-            
+            log.error(f"Error retrieving buckets not public access block: {e}")
+            raise
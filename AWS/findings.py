@@ -0,0 +1,184 @@
+from itertools import zip_longest
+
+# Shown on the table cells of the fields that are not set
+EMPTY_CELL = "-"
+
+
+class Finding:
+    """
+    Base class of the finding records.
+
+    Each finder emits its own record, with a fixed set of fields declared once in __slots__,
+    so no dictionary is allocated per resource. Records are converted to dictionaries, JSON
+    and table rows only when they are written.
+
+    The output names of the fields are kept in columns, in the same order of __slots__.
+    Every record has a "region" field, whatever its output name.
+
+    compared lists the columns that describe the state of the resource. The delta mode reports
+    a finding as changed only when one of them changes, not when a derived value like the
+    savings estimate or the days since an event moves.
+    """
+
+    __slots__ = ()
+    columns = ()
+    compared = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = dict(zip(cls.columns, cls.__slots__))
+
+    def __init__(self, *values):
+        # Fields that are not informed, like the savings, start as None
+        for slot, value in zip_longest(self.__slots__, values):
+            setattr(self, slot, value)
+
+    def get(self, column: str, default=None):
+        """
+        Retrieves a field by its output name, like dict.get.
+
+        Args:
+            column (str): The output name, for example "VolumeId".
+            default: Returned when the record has no such field or it is not set.
+
+        Returns:
+            The field value.
+        """
+        slot = self.fields.get(column)
+        value = getattr(self, slot) if slot else None
+        return default if value is None else value
+
+    def to_dict(self):
+        """
+        Converts the record to a dictionary. Fields that are not set are left out.
+
+        Returns:
+            dict: The finding by output name.
+        """
+        return {
+            column: value
+            for column, value in zip(self.columns, (getattr(self, slot) for slot in self.__slots__))
+            if value is not None
+        }
+
+    def to_row(self):
+        """
+        Converts the record to a table row, with one cell per column. Fields that are not set are shown as "-".
+
+        Returns:
+            list: The values as strings.
+        """
+        values = (getattr(self, slot) for slot in self.__slots__)
+        return [EMPTY_CELL if value is None else str(value) for value in values]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+
+class GP2Volume(Finding):
+    __slots__ = ("region", "volume_id", "volume_type", "size", "savings")
+    columns = ("Region", "VolumeId", "VolumeType", "Size", "MonthlySavings")
+    compared = ("VolumeType", "Size")
+
+
+class StoppedInstanceVolume(Finding):
+    __slots__ = ("region", "instance", "device", "volume", "volume_type", "size", "stopped_at", "stopped_days", "savings")
+    columns = ("region", "instance", "device", "volume", "VolumeType", "Size", "StoppedAt", "StoppedDays", "MonthlySavings")
+    compared = ("instance", "device", "VolumeType", "Size", "StoppedAt")
+
+
+class DetachedVolume(Finding):
+    __slots__ = ("region", "volume", "availability_zone", "volume_type", "size", "savings")
+    columns = ("region", "volume", "AvailabilityZone", "VolumeType", "Size", "MonthlySavings")
+    compared = ("AvailabilityZone", "VolumeType", "Size")
+
+
+class DetachedAddress(Finding):
+    __slots__ = ("region", "address", "allocation_id", "savings")
+    columns = ("Region", "Address", "AllocationId", "MonthlySavings")
+    compared = ("Address", "AllocationId")
+
+
+class OldSnapshot(Finding):
+    __slots__ = ("region", "snapshot_id", "start_time", "volume_size", "savings")
+    columns = ("Region", "SnapshotId", "StartTime", "VolumeSize", "MonthlySavings")
+    compared = ("StartTime", "VolumeSize")
+
+
+class LineageSnapshot(Finding):
+    __slots__ = ("region", "snapshot_id", "volume_id", "start_time", "volume_size", "status", "savings")
+    columns = ("Region", "SnapshotId", "VolumeId", "StartTime", "VolumeSize", "Status", "MonthlySavings")
+    compared = ("VolumeId", "StartTime", "VolumeSize", "Status")
+
+
+class ExposedGroup(Finding):
+    __slots__ = ("region", "group_id", "group_name", "vpc_id", "severity", "exposure", "interfaces")
+    columns = ("Region", "GroupId", "GroupName", "VpcId", "Severity", "Exposure", "Interfaces")
+    compared = ("GroupName", "VpcId", "Severity", "Exposure", "Interfaces")
+
+
+class PublicDBInstance(Finding):
+    __slots__ = ("region", "db_instance_identifier", "publicly_accessible")
+    columns = ("Region", "DBInstanceIdentifier", "PubliclyAccessible")
+    compared = ("PubliclyAccessible",)
+
+
+class PublicBucket(Finding):
+    __slots__ = ("bucket", "region", "public", "status")
+    columns = ("Bucket", "Region", "Public", "Status")
+    compared = ("Public", "Status")
+
+
+def to_dict(item):
+    """
+    Converts a finding to a dictionary. Findings read back from the results store or from
+    the delta state are already dictionaries.
+
+    Args:
+        item (Finding | dict): The finding.
+
+    Returns:
+        dict: The finding.
+    """
+    return item.to_dict() if isinstance(item, Finding) else item
+
+
+def to_row(item, columns: list = None):
+    """
+    Converts a finding, or any other table row, to a list of strings.
+
+    Args:
+        item (Finding | dict): The finding.
+        columns (list): The columns of the row. None uses all the columns of a record, or the keys of a dictionary.
+
+    Returns:
+        list: The values as strings, one per column.
+    """
+    if columns is None:
+        return item.to_row() if isinstance(item, Finding) else [str(value) for value in item.values()]
+    return [EMPTY_CELL if item.get(column) is None else str(item.get(column)) for column in columns]
+
+
+def get_columns(items: list):
+    """
+    Lists the columns of a batch of findings of the same check.
+
+    Records share the columns of their class. Findings read back from the results store are
+    dictionaries without the fields that were not set, so their keys are merged in order.
+
+    Args:
+        items (list): The findings.
+
+    Returns:
+        list: The column names.
+    """
+    if items and isinstance(items[0], Finding):
+        return list(items[0].columns)
+    return list(dict.fromkeys(column for item in items for column in item))
+
+
+def to_json(value):
+    """
+    The default hook of json.dumps: records are written as dictionaries, anything else as a string.
+    """
+    return value.to_dict() if isinstance(value, Finding) else str(value)
@@ -0,0 +1,210 @@
+import threading
+
+from AWS.clients import get_client
+
+
+class EC2Inventory:
+    """
+    Per-scan cache of EC2 collections.
+
+    Each collection is fetched once per region and indexed by its id, so every EC2
+    finder that needs it runs as an in-memory filter instead of calling the API again.
+    """
+
+    def __init__(self, session=None):
+        """
+        Initializes an empty EC2Inventory.
+
+        Args:
+            session (boto3.Session): The session used to create clients. None uses the default session.
+        """
+        self.session = session
+        self.shared = set()
+        self.collections = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def get_lock(self, key):
+        """
+        Retrieves the lock that guards the fetch of a collection in a region.
+
+        Args:
+            key (tuple): The collection name, the region and the filters.
+
+        Returns:
+            threading.Lock: The lock of the collection.
+        """
+        with self.lock:
+            if key not in self.locks:
+                self.locks[key] = threading.Lock()
+            return self.locks[key]
+
+    def share(self, name: str):
+        """
+        Marks a collection as read by more than one check. Shared collections are fetched
+        once without filters and each check filters them on the client.
+
+        Args:
+            name (str): The collection name, for example "volumes".
+        """
+        self.shared.add(name)
+
+    def get_collection(self, name: str, region: str, fetch, query=None):
+        """
+        Retrieves a collection, fetching it on the first use in the region.
+
+        When the collection is not shared, the filters of the query are pushed down to the
+        request and the filtered collection is cached under its own key.
+
+        Args:
+            name (str): The collection name, for example "volumes".
+            region (str): The AWS region of the collection.
+            fetch (callable): Function that receives an EC2 client and the request parameters,
+                and returns the indexed collection.
+            query (Query): Only the items that match the query are returned.
+
+        Returns:
+            dict: The collection items indexed by id.
+        """
+        if query is not None and name in self.shared:
+            items = self.get_collection(name, region, fetch)
+            return {item_id: item for item_id, item in items.items() if query.matches_all(item)}
+
+        key = (name, region, query.get_key() if query else ())
+        if key not in self.collections:
+            # Only one finder fetches the collection, the others wait and reuse it
+            with self.get_lock(key):
+                if key not in self.collections:
+                    client = get_client('ec2', region, self.session)
+                    self.collections[key] = fetch(client, query.get_params() if query else {})
+
+        items = self.collections[key]
+        if query is None:
+            return items
+        return {item_id: item for item_id, item in items.items() if query.matches(item)}
+
+    def get_volumes(self, region: str, query=None):
+        """
+        Retrieves the EBS volumes of the region indexed by VolumeId.
+
+        Args:
+            region (str): The AWS region to retrieve the volumes from.
+            query (Query): Only the volumes that match the query are returned.
+
+        Returns:
+            dict: The volumes indexed by VolumeId.
+        """
+        def fetch(client, params):
+            volumes = {}
+            for page in client.get_paginator('describe_volumes').paginate(**params):
+                for volume in page.get('Volumes', []):
+                    volumes[volume['VolumeId']] = volume
+            return volumes
+
+        return self.get_collection('volumes', region, fetch, query)
+
+    def get_instances(self, region: str, query=None):
+        """
+        Retrieves the EC2 instances of the region indexed by InstanceId.
+
+        Args:
+            region (str): The AWS region to retrieve the instances from.
+            query (Query): Only the instances that match the query are returned.
+
+        Returns:
+            dict: The instances indexed by InstanceId.
+        """
+        def fetch(client, params):
+            instances = {}
+            for page in client.get_paginator('describe_instances').paginate(**params):
+                for reservation in page.get('Reservations', []):
+                    for instance in reservation['Instances']:
+                        instances[instance['InstanceId']] = instance
+            return instances
+
+        return self.get_collection('instances', region, fetch, query)
+
+    def get_security_groups(self, region: str, query=None):
+        """
+        Retrieves the security groups of the region indexed by GroupId.
+
+        Args:
+            region (str): The AWS region to retrieve the security groups from.
+            query (Query): Only the security groups that match the query are returned.
+
+        Returns:
+            dict: The security groups indexed by GroupId.
+        """
+        def fetch(client, params):
+            groups = {}
+            for page in client.get_paginator('describe_security_groups').paginate(**params):
+                for group in page.get('SecurityGroups', []):
+                    groups[group['GroupId']] = group
+            return groups
+
+        return self.get_collection('security_groups', region, fetch, query)
+
+    def get_network_interfaces(self, region: str, query=None):
+        """
+        Retrieves the network interfaces of the region indexed by NetworkInterfaceId.
+
+        Args:
+            region (str): The AWS region to retrieve the network interfaces from.
+            query (Query): Only the network interfaces that match the query are returned.
+
+        Returns:
+            dict: The network interfaces indexed by NetworkInterfaceId.
+        """
+        def fetch(client, params):
+            interfaces = {}
+            for page in client.get_paginator('describe_network_interfaces').paginate(**params):
+                for interface in page.get('NetworkInterfaces', []):
+                    interfaces[interface['NetworkInterfaceId']] = interface
+            return interfaces
+
+        return self.get_collection('network_interfaces', region, fetch, query)
+
+    def get_snapshots(self, region: str, query=None):
+        """
+        Retrieves the EBS snapshots owned by the account in the region indexed by SnapshotId.
+
+        Args:
+            region (str): The AWS region to retrieve the snapshots from.
+            query (Query): Only the snapshots that match the query are returned.
+
+        Returns:
+            dict: The snapshots indexed by SnapshotId.
+        """
+        def fetch(client, params):
+            snapshots = {}
+            for page in client.get_paginator('describe_snapshots').paginate(OwnerIds=['self'], **params):
+                for snapshot in page.get('Snapshots', []):
+                    snapshots[snapshot['SnapshotId']] = snapshot
+            return snapshots
+
+        return self.get_collection('snapshots', region, fetch, query)
+
+    def get_images(self, region: str, query=None):
+        """
+        Retrieves the AMIs owned by the account in the region indexed by ImageId.
+
+        Args:
+            region (str): The AWS region to retrieve the images from.
+            query (Query): Only the images that match the query are returned.
+
+        Returns:
+            dict: The images indexed by ImageId.
+        """
+        def fetch(client, params):
+            if client.can_paginate('describe_images'):
+                pages = client.get_paginator('describe_images').paginate(Owners=['self'], **params)
+            else:
+                pages = [client.describe_images(Owners=['self'], **params)]
+
+            images = {}
+            for page in pages:
+                for image in page.get('Images', []):
+                    images[image['ImageId']] = image
+            return images
+
+        return self.get_collection('images', region, fetch, query)
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+
+from collections import defaultdict
+from AWS.scheduler import THROTTLING_ERRORS
+
+
+class ScanMetrics:
+    """
+    Collects timings and API call metrics of a scan.
+
+    API metrics are collected through botocore event hooks registered on every client
+    of the client pool, so finders do not need any change to be measured.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty, disabled, ScanMetrics.
+        """
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.timings = []
+        self.calls = defaultdict(lambda: {"calls": 0, "retries": 0, "throttles": 0, "errors": 0, "bytes": 0})
+
+    def install(self, pool):
+        """
+        Enables the metrics and registers the event hooks on the clients of the pool.
+
+        Args:
+            pool (ClientPool): The pool whose clients are measured.
+        """
+        self.enabled = True
+        pool.register("after-call", self.after_call)
+        pool.register("needs-retry", self.needs_retry)
+
+    def get_key(self, model, context):
+        return (model.service_model.service_name, context.get("client_region") or "global", model.name)
+
+    def after_call(self, http_response, parsed, model, context, **kwargs):
+        metadata = parsed.get("ResponseMetadata", {})
+        content = getattr(http_response, "content", None) or b""
+
+        with self.lock:
+            entry = self.calls[self.get_key(model, context)]
+            entry["calls"] += 1
+            entry["retries"] += metadata.get("RetryAttempts", 0)
+            entry["bytes"] += len(content)
+            if "Error" in parsed:
+                entry["errors"] += 1
+
+    def needs_retry(self, response=None, operation=None, request_dict=None, **kwargs):
+        # Only observes the attempts, returning None keeps the retry decision to botocore
+        if response is None or operation is None:
+            return None
+
+        code = response[1].get("Error", {}).get("Code")
+        if code in THROTTLING_ERRORS:
+            context = (request_dict or {}).get("context", {})
+            with self.lock:
+                self.calls[self.get_key(operation, context)]["throttles"] += 1
+        return None
+
+    def record_timing(self, operation: str, region: str, seconds: float, results: int):
+        """
+        Records the wall time of an operation in a region.
+
+        Args:
+            operation (str): The operation, for example "GET - GP2 volumes".
+            region (str): The AWS region.
+            seconds (float): The wall time.
+            results (int): Number of items found.
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.timings.append({"operation": operation, "region": region, "seconds": seconds, "results": results})
+
+    def get_api_calls(self):
+        """
+        Retrieves the API metrics by service, region and operation.
+
+        Returns:
+            list: One dictionary per service, region and operation, the most called first.
+        """
+        with self.lock:
+            rows = [
+                dict({"service": service, "region": region, "operation": operation}, **values)
+                for (service, region, operation), values in self.calls.items()
+            ]
+        return sorted(rows, key=lambda row: row["calls"], reverse=True)
+
+    def to_dict(self):
+        """
+        Retrieves all the metrics.
+
+        Returns:
+            dict: The timings, the slowest first, and the API calls.
+        """
+        with self.lock:
+            timings = sorted(self.timings, key=lambda timing: timing["seconds"], reverse=True)
+        return {"timings": timings, "api_calls": self.get_api_calls()}
+
+    def write_json(self, path: str):
+        """
+        Writes the metrics as JSON.
+
+        Args:
+            path (str): The JSON file.
+        """
+        make_directory(path)
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    def write_prometheus(self, path: str):
+        """
+        Writes the metrics in the Prometheus textfile format, for the node exporter textfile collector.
+
+        Args:
+            path (str): The textfile.
+        """
+        metrics = self.to_dict()
+        lines = [
+            "# HELP revise_finder_duration_seconds Wall time of a finder in a region.",
+            "# TYPE revise_finder_duration_seconds gauge",
+        ]
+        for timing in metrics["timings"]:
+            labels = f'operation="{escape(timing["operation"])}",region="{escape(timing["region"])}"'
+            lines.append(f"revise_finder_duration_seconds{{{labels}}} {timing['seconds']:.6f}")
+
+        lines += [
+            "# HELP revise_finder_results Number of items found by a finder in a region.",
+            "# TYPE revise_finder_results gauge",
+        ]
+        for timing in metrics["timings"]:
+            labels = f'operation="{escape(timing["operation"])}",region="{escape(timing["region"])}"'
+            lines.append(f"revise_finder_results{{{labels}}} {timing['results']}")
+
+        for name, field, description in [
+            ("revise_api_calls_total", "calls", "API calls."),
+            ("revise_api_retries_total", "retries", "API call retries."),
+            ("revise_api_throttles_total", "throttles", "Throttled API call attempts."),
+            ("revise_api_errors_total", "errors", "API calls that returned an error."),
+            ("revise_api_received_bytes_total", "bytes", "Bytes received from the API."),
+        ]:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for row in metrics["api_calls"]:
+                labels = f'service="{row["service"]}",region="{row["region"]}",operation="{row["operation"]}"'
+                lines.append(f"{name}{{{labels}}} {row[field]}")
+
+        make_directory(path)
+        with open(path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def show_summary(self, console, limit=15):
+        """
+        Prints the slowest finders and the most called APIs.
+
+        Args:
+            console (rich.console.Console): The console used to print.
+            limit (int): Maximum number of rows of each table.
+        """
+        from rich.table import Table, box
+
+        metrics = self.to_dict()
+
+        timings = Table(title="[bold purple]Slowest finders", show_header=True, box=box.ROUNDED, title_justify='left')
+        for column in ["Operation", "Region", "Seconds", "Results"]:
+            timings.add_column(column)
+        for timing in metrics["timings"][:limit]:
+            timings.add_row(timing["operation"], timing["region"], f"{timing['seconds']:.3f}", str(timing["results"]))
+
+        calls = Table(title="[bold purple]API calls", show_header=True, box=box.ROUNDED, title_justify='left')
+        for column in ["Service", "Region", "Operation", "Calls", "Retries", "Throttles", "Errors", "KiB"]:
+            calls.add_column(column)
+        for row in metrics["api_calls"][:limit]:
+            calls.add_row(row["service"], row["region"], row["operation"], str(row["calls"]), str(row["retries"]),
+                          str(row["throttles"]), str(row["errors"]), f"{row['bytes'] / 1024:.1f}")
+
+        console.print()
+        console.print(timings)
+        console.print(calls)
+        console.print()
+
+
+def escape(value: str):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def make_directory(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+# Metrics of the current scan, enabled by the --profile option
+metrics = ScanMetrics()
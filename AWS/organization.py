@@ -0,0 +1,210 @@
+import multiprocessing
+import boto3
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from rich.console import Console
+from utils.logger import log
+from AWS.clients import get_client
+
+# Initialize Rich Console for better terminal output formatting
+console = Console()
+
+
+def read_accounts(accounts: str = None, accounts_file: str = None):
+    """
+    Reads the accounts to scan from a string and/or a file.
+
+    Args:
+        accounts (str): A space-separated string of account IDs or role ARNs.
+        accounts_file (str): A file with one account ID or role ARN per line. Lines starting with # are ignored.
+
+    Returns:
+        list: The account IDs and role ARNs, without duplicates.
+    """
+    targets = accounts.split() if accounts else []
+
+    if accounts_file:
+        with open(accounts_file, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    targets.append(line)
+
+    return list(dict.fromkeys(targets))
+
+
+def get_role_arn(target: str, role_name: str):
+    """
+    Builds the ARN of the role assumed on an account.
+
+    Args:
+        target (str): An account ID or a role ARN.
+        role_name (str): The role assumed when the target is an account ID.
+
+    Returns:
+        str: The role ARN.
+    """
+    if target.startswith("arn:"):
+        return target
+    return f"arn:aws:iam::{target}:role/{role_name}"
+
+
+def assume_role(role_arn: str):
+    """
+    Assumes a role and creates a session with its temporary credentials.
+
+    Args:
+        role_arn (str): The ARN of the role to assume.
+
+    Returns:
+        boto3.Session: A session of the assumed role.
+    """
+    sts_client = get_client('sts')
+    credentials = sts_client.assume_role(
+        RoleArn=role_arn, RoleSessionName="revise-cli")["Credentials"]
+
+    return boto3.Session(
+        aws_access_key_id=credentials["AccessKeyId"],
+        aws_secret_access_key=credentials["SecretAccessKey"],
+        aws_session_token=credentials["SessionToken"]
+    )
+
+
+def scan_account(target: str, role_name: str, scope: str, regions, concurrency: int):
+    """
+    Scans one account of the organization. Runs inside a worker process.
+
+    Args:
+        target (str): An account ID or a role ARN.
+        role_name (str): The role assumed when the target is an account ID.
+        scope (str): What to scan: "costs", "security" or "all".
+        regions (str): A space-separated string of AWS region names, or "all".
+        concurrency (int): Maximum number of regions scanned at the same time.
+
+    Returns:
+        tuple: The account ID and its recommendations. Accounts that failed, or whose checks failed
+            on some regions, also have an error message.
+    """
+    from AWS import commands
+    from AWS import recommendations
+    from AWS.commom import metadata_cache
+
+    # Workers share the terminal, only the parent process prints
+    recommendations.console.quiet = True
+
+    # Entries keyed by short-lived assumed-role credentials are never reused
+    metadata_cache.configure(enabled=False)
+
+    role_arn = get_role_arn(target, role_name)
+    account_id = role_arn.split(":")[4]
+    log.info(f"Account: {account_id} | Organization scan started!")
+
+    try:
+        session = assume_role(role_arn)
+        result = commands.run_checks(scope, regions, None, concurrency, session, account_id)
+
+    # The findings of the checks that completed are kept with the error
+    except recommendations.ScanFailed as error:
+        log.error(f"Account: {account_id} | Organization scan failed on some checks: {error}")
+        return account_id, dict(error.results, error=str(error))
+
+    # Errors like a role that can not be assumed fail the account, not the worker process
+    except Exception as error:
+        log.error(f"Account: {account_id} | Organization scan failed: {error}")
+        return account_id, {"error": str(error)}
+
+    log.info(f"Account: {account_id} | Organization scan finished!")
+    return account_id, result
+
+
+def init_worker():
+    """
+    Writes the queued log records when the worker exits, since the workers do not run the atexit handlers.
+    """
+    from multiprocessing.util import Finalize
+    from utils import logger
+
+    Finalize(None, logger.shutdown, exitpriority=10)
+
+
+def scan_organization(targets: list, role_name: str, scope: str, regions, processes: int, concurrency: int):
+    """
+    Scans many accounts, spreading them across a process pool.
+
+    Each worker scans one account at a time, with its regions scanned in parallel.
+
+    Args:
+        targets (list): The account IDs and role ARNs to scan.
+        role_name (str): The role assumed when a target is an account ID.
+        scope (str): What to scan: "costs", "security" or "all".
+        regions (str): A space-separated string of AWS region names, or "all".
+        processes (int): Maximum number of accounts scanned at the same time.
+        concurrency (int): Maximum number of regions scanned at the same time on each account.
+
+    Returns:
+        dict: The recommendations keyed by account ID, in the same order as the targets.
+    """
+    results = {}
+    workers = max(1, min(processes, len(targets)))
+
+    # spawn avoids sharing the boto3 clients and locks of the parent process with the workers
+    context = multiprocessing.get_context("spawn")
+
+    with console.status(f"Organization | Scanning {len(targets)} accounts!", spinner="aesthetic"):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as executor:
+            futures = [
+                executor.submit(scan_account, target, role_name, scope, regions, concurrency)
+                for target in targets
+            ]
+            for future in as_completed(futures):
+                account_id, result = future.result()
+                results[account_id] = result
+                console.print(f"Account: {account_id} | {'failed' if 'error' in result else 'finished'}")
+
+    # Keep the report in the same order as the targets
+    ordered = [get_role_arn(target, role_name).split(":")[4] for target in targets]
+    return {account_id: results[account_id] for account_id in ordered if account_id in results}
+
+
+def show_summary(report: dict):
+    """
+    Prints a table with the number of findings of each account.
+
+    Args:
+        report (dict): The recommendations keyed by account ID.
+    """
+    from rich.table import Table, box
+    from AWS.savings import SAVINGS_ATTRIBUTE
+
+    table = Table(
+        title="[bold purple]Organization summary", show_header=True, box=box.ROUNDED,
+        title_justify='left'
+    )
+    table.add_column("Account")
+    table.add_column("Status")
+    table.add_column("Findings")
+    table.add_column("Monthly savings")
+
+    for account_id, result in report.items():
+        if "error" in result:
+            table.add_row(account_id, "[red]Failed", result["error"], "-")
+            continue
+
+        savings = sum(
+            item.get(SAVINGS_ATTRIBUTE, 0)
+            for category in result.values()
+            for items in category.values()
+            for item in items
+        )
+
+        findings = [
+            f"{name}: {len(items)}"
+            for category in result.values()
+            for name, items in category.items()
+            if items
+        ]
+        table.add_row(account_id, "Finished", "\n".join(findings) or "-", f"{savings:.2f}")
+
+    console.print()
+    console.print(table)
+    console.print()
@@ -0,0 +1,165 @@
+import csv
+import json
+import sys
+
+from abc import ABC, abstractmethod
+
+from AWS.delta import RESOURCE_IDS, get_region
+from AWS.findings import to_dict, to_json
+
+# Machine-readable formats accepted by the --output option
+OUTPUT_FORMATS = ["json", "ndjson", "csv"]
+
+
+class OutputWriter(ABC):
+    """
+    Base class of the writers that stream findings as soon as each region completes.
+
+    Findings are written under a name, a tuple with the category and the finder,
+    for example ("costs", "gp2_volumes").
+    """
+
+    def __init__(self, file: str = None):
+        """
+        Initializes the writer.
+
+        Args:
+            file (str): The file where the findings are written. None writes to stdout.
+        """
+        self.file = open(file, 'w', newline='') if file else sys.stdout
+
+    @abstractmethod
+    def write(self, name: tuple, items: list):
+        """
+        Writes the findings of one region.
+
+        Args:
+            name (tuple): The category and the finder of the findings.
+            items (list): The findings.
+        """
+
+    def close(self):
+        """
+        Finishes the output and closes the file.
+        """
+        self.file.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class NDJSONWriter(OutputWriter):
+    """
+    Writes one JSON object per finding and per line.
+    """
+
+    def write(self, name: tuple, items: list):
+        category, finder = name
+        for item in items:
+            record = {"category": category, "finder": finder}
+            record.update(to_dict(item))
+            self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+
+
+class JSONWriter(OutputWriter):
+    """
+    Writes a single JSON document grouped by category and finder, the same layout of data.json.
+    """
+
+    def __init__(self, file: str = None):
+        super().__init__(file)
+        self.category = None
+        self.finder = None
+        self.first_item = True
+        self.file.write("{")
+
+    def write(self, name: tuple, items: list):
+        category, finder = name
+
+        # Open a new category and/or finder when the name changes
+        if category != self.category:
+            if self.category is not None:
+                self.file.write("\n        ]\n    },")
+            self.file.write(f"\n    {json.dumps(category)}: {{")
+            self.category = category
+            self.finder = None
+
+        if finder != self.finder:
+            if self.finder is not None:
+                self.file.write("\n        ],")
+            self.file.write(f"\n        {json.dumps(finder)}: [")
+            self.finder = finder
+            self.first_item = True
+
+        for item in items:
+            self.file.write(("" if self.first_item else ",") + "\n            " + json.dumps(item, default=to_json))
+            self.first_item = False
+        self.file.flush()
+
+    def close(self):
+        if self.category is not None:
+            self.file.write("\n        ]\n    }")
+        self.file.write("\n}\n")
+        super().close()
+
+
+class CSVWriter(OutputWriter):
+    """
+    Writes one row per finding. The attributes of each finder are kept as a JSON column.
+    """
+
+    def __init__(self, file: str = None):
+        super().__init__(file)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["category", "finder", "region", "resource", "attributes"])
+
+    def write(self, name: tuple, items: list):
+        category, finder = name
+        for item in items:
+            self.writer.writerow([
+                category,
+                finder,
+                get_region(item),
+                item.get(RESOURCE_IDS.get(finder), ""),
+                json.dumps(item, default=to_json)
+            ])
+        self.file.flush()
+
+
+class MultiWriter:
+    """
+    Sends the same findings to many writers.
+    """
+
+    def __init__(self, writers: list):
+        self.writers = [writer for writer in writers if writer is not None]
+
+    def write(self, name: tuple, items: list):
+        for writer in self.writers:
+            writer.write(name, items)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+def get_writer(output: str, file: str = None):
+    """
+    Creates the writer of a machine-readable output format.
+
+    Args:
+        output (str): The output format: json, ndjson or csv.
+        file (str): The file where the findings are written. None writes to stdout.
+
+    Returns:
+        OutputWriter: The writer, or None when the output is not machine-readable (for example "table").
+    """
+    match output:
+        case "json":
+            return JSONWriter(file)
+        case "ndjson":
+            return NDJSONWriter(file)
+        case "csv":
+            return CSVWriter(file)
+        case _:
+            return None
@@ -0,0 +1,212 @@
+from datetime import date, timedelta
+
+# API filters that can express a predicate, by collection and attribute
+FILTER_NAMES = {
+    "volumes": {"State": "status", "VolumeType": "volume-type", "AvailabilityZone": "availability-zone", "VolumeId": "volume-id"},
+    "instances": {"State.Name": "instance-state-name", "InstanceType": "instance-type"},
+    "snapshots": {"StartTime": "start-time", "State": "status", "VolumeId": "volume-id"},
+    "addresses": {"Domain": "domain", "PublicIp": "public-ip"},
+    "db_instances": {"Engine": "engine"},
+}
+
+# Snapshots older than this year do not exist, EBS snapshots were launched in 2008
+FIRST_YEAR = 2008
+
+# Maximum number of values of a single API filter
+MAX_FILTER_VALUES = 200
+
+
+def get_attribute(item: dict, attribute: str):
+    """
+    Retrieves a nested attribute of an API item, for example "State.Name".
+
+    Args:
+        item (dict): The API item.
+        attribute (str): The attribute path, separated by dots.
+
+    Returns:
+        The attribute value, or None when it does not exist.
+    """
+    value = item
+    for key in attribute.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class Equals:
+    """
+    The attribute is equal to one of the values.
+    """
+
+    def __init__(self, attribute: str, *values):
+        self.attribute = attribute
+        self.values = values
+
+    def to_filter(self, collection: str):
+        name = FILTER_NAMES.get(collection, {}).get(self.attribute)
+        if name is None:
+            return None
+        return {"Name": name, "Values": [str(value).lower() if isinstance(value, bool) else str(value) for value in self.values]}
+
+    def matches(self, item: dict):
+        return get_attribute(item, self.attribute) in self.values
+
+
+class Missing:
+    """
+    The attribute does not exist. No API filter can express it, so it is always checked on the client.
+    """
+
+    def __init__(self, attribute: str):
+        self.attribute = attribute
+
+    def to_filter(self, collection: str):
+        return None
+
+    def matches(self, item: dict):
+        return get_attribute(item, self.attribute) is None
+
+
+class Before:
+    """
+    The date of a timestamp attribute is before a limit.
+
+    Timestamp filters only support wildcards, so the range is sent as the prefixes of every
+    year, month and day before the limit, for example "2023-*", "2024-01-*" and "2024-02-01*".
+    """
+
+    def __init__(self, attribute: str, limit: date):
+        self.attribute = attribute
+        self.limit = limit
+
+    def get_prefixes(self):
+        """
+        Builds the wildcard prefixes that match the dates before the limit.
+
+        Returns:
+            list: The wildcard values.
+        """
+        limit = self.limit
+        prefixes = [f"{year}-*" for year in range(FIRST_YEAR, limit.year)]
+        prefixes += [f"{limit.year}-{month:02d}-*" for month in range(1, limit.month)]
+        prefixes += [f"{limit.year}-{limit.month:02d}-{day:02d}*" for day in range(1, limit.day)]
+        return prefixes
+
+    def to_filter(self, collection: str):
+        name = FILTER_NAMES.get(collection, {}).get(self.attribute)
+        prefixes = self.get_prefixes()
+        if name is None or not prefixes or len(prefixes) > MAX_FILTER_VALUES:
+            return None
+        return {"Name": name, "Values": prefixes}
+
+    def matches(self, item: dict):
+        value = get_attribute(item, self.attribute)
+        return value is not None and value.date() < self.limit
+
+
+class Between:
+    """
+    The date of a timestamp attribute is on or after a start and before a limit.
+
+    The range is sent as the prefix of each day, for example "2024-02-01*", so only short
+    ranges, like the days since the previous scan, are pushed down.
+    """
+
+    def __init__(self, attribute: str, start: date, limit: date):
+        self.attribute = attribute
+        self.start = start
+        self.limit = limit
+
+    def get_prefixes(self):
+        """
+        Builds the wildcard prefixes that match the dates of the range.
+
+        Returns:
+            list: The wildcard values.
+        """
+        return [f"{self.start + timedelta(days=day):%Y-%m-%d}*" for day in range((self.limit - self.start).days)]
+
+    def to_filter(self, collection: str):
+        name = FILTER_NAMES.get(collection, {}).get(self.attribute)
+        prefixes = self.get_prefixes()
+        if name is None or not prefixes or len(prefixes) > MAX_FILTER_VALUES:
+            return None
+        return {"Name": name, "Values": prefixes}
+
+    def matches(self, item: dict):
+        value = get_attribute(item, self.attribute)
+        return value is not None and self.start <= value.date() < self.limit
+
+
+class Query:
+    """
+    Predicates on an API collection.
+
+    Predicates supported by the API filters of the collection are pushed down to the request,
+    so fewer items and pages are transferred. The others are checked on the client.
+    """
+
+    def __init__(self, collection: str, *predicates, push_down=True):
+        """
+        Initializes the Query.
+
+        Args:
+            collection (str): The collection name, for example "volumes".
+            *predicates: The predicates, all of them must match.
+            push_down (bool): When False every predicate is checked on the client.
+        """
+        self.collection = collection
+        self.predicates = predicates
+        self.filters = []
+        self.client_predicates = []
+
+        for predicate in predicates:
+            api_filter = predicate.to_filter(collection) if push_down else None
+            if api_filter is None:
+                self.client_predicates.append(predicate)
+            else:
+                self.filters.append(api_filter)
+
+    def get_key(self):
+        """
+        Builds a key that identifies the API filters, used to cache the filtered collections.
+
+        Returns:
+            tuple: The filter names and values.
+        """
+        return tuple((api_filter["Name"], tuple(api_filter["Values"])) for api_filter in self.filters)
+
+    def get_params(self):
+        """
+        Retrieves the request parameters with the pushed down filters.
+
+        Returns:
+            dict: The Filters parameter, or no parameter when nothing was pushed down.
+        """
+        return {"Filters": self.filters} if self.filters else {}
+
+    def matches(self, item: dict):
+        """
+        Checks the predicates that were not pushed down.
+
+        Args:
+            item (dict): An item returned by the filtered request.
+
+        Returns:
+            bool: True when the item matches.
+        """
+        return all(predicate.matches(item) for predicate in self.client_predicates)
+
+    def matches_all(self, item: dict):
+        """
+        Checks every predicate, used on collections fetched without filters.
+
+        Args:
+            item (dict): An item of the collection.
+
+        Returns:
+            bool: True when the item matches.
+        """
+        return all(predicate.matches(item) for predicate in self.predicates)
@@ -1,6 +1,9 @@
-import json
-import boto3
+import heapq
+import logging
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from utils.logger import log
 from rich.console import Console
 from rich.table import Table, box
@@ -8,13 +11,25 @@ from AWS.finder import EC2Finder
 from AWS.finder import S3Finder
 from AWS.finder import RDSFinder
 from AWS.commom import RegionsFinder
+from AWS.registry import get_check
+from common import config
+from AWS.metrics import metrics
+from AWS.savings import SavingsEstimator, SavingsSummary, SAVINGS_ATTRIBUTE
+from AWS.findings import get_columns, to_row
+from AWS.delta import get_region
 
 # Initialize Rich Console for better terminal output formatting
 console = Console()
 
+#Load config file
+config = config.load_configs()
+
+# The price table is loaded once and shared by every plan
+estimator = SavingsEstimator(config["savings"]["pricesFile"])
+
 class AWSRecommendations():
 
-    def __init__(self, title: str, description: str, documentation: str, data: list):
+    def __init__(self, title: str, description: str, documentation: str, data: list, caption: str = None, summary: list = None):
         """
         Initialize a new recommendation object.
 
@@ -23,11 +38,15 @@ class AWSRecommendations():
             description (str): A brief description of the recommendation.
             documentation (str): The documentation for the recommendation.
             data (list): A list of items that were found.
+            caption (str): A note shown below the table.
+            summary (list): Rows of a summary table shown after the items.
         """
         self.title = title
         self.description = description
         self.documentation = documentation
         self.data = data
+        self.caption = caption
+        self.summary = summary
 
     # Function to display data in a tabular format with a title and optional recommendation
     def show_recommendations(self):
@@ -38,23 +57,23 @@ class AWSRecommendations():
         # Create a Rich Table with specified title and formatting
         table = Table(
             title=f"[bold purple]{self.title}", show_header=True, show_lines=True, box=box.ROUNDED,
-            title_justify='left'
+            title_justify='left', caption=self.caption, caption_justify='left'
         )
 
-        # Extract column names from the data
-        columns = self.data[0].keys()
+        # Columns come from the record class, so the cells stay aligned when a field is not set.
+        # Columns that no finding sets, like the savings when they are not estimated, are left out
+        columns = [
+            column for column in get_columns(self.data)
+            if any(item.get(column) is not None for item in self.data)
+        ]
 
         # Add columns to the table
         for column in columns:
             table.add_column(column)
 
-        # Add rows to the table
-        for region in self.data:
-            row = []
-            # Populate each row with values from the region dictionary
-            for key, value in region.items():
-                row.append(value)
-            table.add_row(*row)
+        # Add rows to the table, records are converted to strings only here
+        for item in self.data:
+            table.add_row(*to_row(item, columns))
 
         console.print()
         console.print()
@@ -62,6 +81,14 @@ class AWSRecommendations():
         # Print the table using Rich Console
         console.print(table)
 
+        if self.summary:
+            summary = Table(title="[bold purple]Findings by region", show_header=True, box=box.ROUNDED, title_justify='left')
+            for column in self.summary[0]:
+                summary.add_column(column)
+            for row in self.summary:
+                summary.add_row(*to_row(row))
+            console.print(summary)
+
         # Print recommendation if provided
         if self.description:
             console.print(
@@ -75,71 +102,447 @@ class AWSRecommendations():
         console.print()
 
 
+class TableRenderer:
+    """
+    Renders the findings of a check as a table, folding the batch of each region as it arrives.
+
+    With max_rows, only the rows that are shown are kept, the highest savings first, and the
+    other findings are counted on a summary by region. The full list stays available on the
+    json, ndjson and csv outputs.
+    """
+
+    def __init__(self, title: str, description: str, documentation: str, max_rows: int = 0, savings: bool = False):
+        """
+        Initializes the TableRenderer.
+
+        Args:
+            title (str): The title of the recommendation.
+            description (str): A brief description of the recommendation.
+            documentation (str): The documentation for the recommendation.
+            max_rows (int): Maximum number of rows shown. 0 shows all of them.
+            savings (bool): True when the findings have a savings estimate, shown the highest first.
+        """
+        self.title = title
+        self.description = description
+        self.documentation = documentation
+        self.max_rows = max(0, int(max_rows or 0))
+        self.savings = savings
+        self.rows = []
+        self.count = 0
+        self.regions = {}
+
+    @staticmethod
+    def get_savings(item):
+        return item.get(SAVINGS_ATTRIBUTE, 0)
+
+    def add(self, items: list):
+        """
+        Adds the findings of a region.
+
+        Args:
+            items (list): The findings.
+        """
+        self.count += len(items)
+        for item in items:
+            region = self.regions.setdefault(get_region(item) or "-", [0, 0.0])
+            region[0] += 1
+            region[1] += self.get_savings(item)
+
+        if not self.max_rows:
+            self.rows.extend(items)
+        elif self.savings:
+            self.rows = heapq.nlargest(self.max_rows, self.rows + items, key=self.get_savings)
+        else:
+            self.rows.extend(items[:self.max_rows - len(self.rows)])
+
+    def get_summary(self):
+        """
+        Retrieves the number of findings and the savings of each region, the most findings first.
+
+        Returns:
+            list: One dictionary per region.
+        """
+        rows = []
+        for region, (count, savings) in sorted(self.regions.items(), key=lambda entry: entry[1][0], reverse=True):
+            row = {"Region": region, "Findings": count}
+            if self.savings:
+                row[SAVINGS_ATTRIBUTE] = f"{savings:.2f}"
+            rows.append(row)
+        return rows
+
+    def show(self):
+        """
+        Shows the table, with a summary by region when some findings are not shown.
+        """
+        if self.savings:
+            self.rows.sort(key=self.get_savings, reverse=True)
+
+        caption = summary = None
+        if self.count > len(self.rows):
+            order = ", the highest savings first" if self.savings else ""
+            caption = (f"Showing {len(self.rows)} of {self.count} findings{order}. Use --max-rows 0 to show all of them, "
+                       "or --output json, ndjson or csv for the full list.")
+            summary = self.get_summary()
+
+        AWSRecommendations(self.title, self.description, self.documentation, self.rows, caption, summary).show_recommendations()
+
+
 class AWSRegionsIterator:
     """
-    Iterates over a set of AWS regions and executes a given function for each region.
+    Holds the regions of a scan and executes a given function on a region, with its logs and timings.
+    The regions are scanned concurrently by the ExecutionPlan.
     """
     
-    def __init__(self, regions, account):
+    def __init__(self, regions, account, concurrency=1):
         """
         Initializes the AWSRegionsIterator with a string of region names.
 
         Args:
             regions_string (str): A space-separated string of AWS region names.
+            account (str): The AWS account ID being scanned.
+            concurrency (int): Maximum number of steps running at the same time.
         """ 
         self.account = account    
+        self.concurrency = max(1, int(concurrency))
         if type(regions) == list:
             self.regions = regions
             
         elif type(regions) == str:
-            self.regions = regions.split(" ")
-            self.regions = set(self.regions)
+            # Remove duplicated regions keeping the order they were informed
+            self.regions = list(dict.fromkeys(regions.split()))
         
-        
-    def execute(self, func, operation, *args):
+    def scan_region(self, func, operation, region, *args):
         """
-        Executes the given function for each AWS region and returns the results.
+        Executes the given function for a single AWS region.
 
         Args:
-            func (callable): The function to be executed for each region.
+            func (callable): The function to be executed for the region.
+            operation (str): A description of the operation, used on logs.
+            region (str): The AWS region to scan.
             *args: Additional arguments to be passed to the function.
 
         Returns:
-            list: A list of results from executing the function for each region.
+            list: The items found on the region.
+        """
+        fields = {"account": self.account, "region": region, "operation": operation}
+        log.info("Account: %s | %s on %s started!", self.account, operation, region, extra=fields)
+
+        # The level is checked once, so the findings cost nothing when DEBUG is disabled
+        debug = log.isEnabledFor(logging.DEBUG)
+
+        # Finders are generators, so items are consumed page by page
+        started = time.perf_counter()
+        data = []
+        for region_itens in func(region, *args) or []:
+            if debug:
+                log.debug("%r", region_itens, extra=fields)
+            data.append(region_itens)
+
+        elapsed = time.perf_counter() - started
+        metrics.record_timing(operation, region, elapsed, len(data))
+        log.info("Account: %s | %s on %s finished!", self.account, operation, region,
+                 extra=dict(fields, findings=len(data), seconds=round(elapsed, 3)))
+        return data
+
+
+class ScanFailed(Exception):
+    """
+    Raised at the end of a plan when some of its steps failed. The other steps completed, and
+    their findings were already written.
+    """
+
+    def __init__(self, results: dict, failures: list):
+        """
+        Initializes the ScanFailed.
+
+        Args:
+            results (dict): The findings of each check, by category and check name.
+            failures (list): The (check name, region, error) of the steps that failed. The region of
+                the checks with the account scope is "global".
+        """
+        self.results = results
+        self.failures = failures
+        super().__init__("; ".join(f"{name} on {region}: {error}" for name, region, error in failures))
+
+
+class ExecutionPlan:
+    """
+    Runs a set of checks over a set of regions as a single concurrent plan.
+
+    API collections shared by the selected checks are fetched once per region, then every
+    (check, region) step runs on the same bounded thread pool. Findings are sent to the
+    writer check by check, in the registry order, as soon as each region completes.
+    """
+
+    def __init__(self, checks, regions, account, output="table", concurrency=1, bucket_concurrency=1,
+                 session=None, writer=None, finders=None, args=None, on_check=None, max_rows=None, watermarks=None):
+        """
+        Initializes the ExecutionPlan.
+
+        Args:
+            checks (list): The checks to run, from AWS.registry.
+            regions (str): A space-separated string or a list of AWS region names, or "all".
+            account (str): The AWS account ID being scanned.
+            output (str): The output format. Tables are shown when it is "table".
+            concurrency (int): Maximum number of steps running at the same time.
+            bucket_concurrency (int): Maximum number of S3 buckets checked at the same time.
+            session (boto3.Session): The session of the scanned account. None uses the default session.
+            writer (OutputWriter): Streams the findings of each region. Findings are only returned
+                when there is no writer or the output is a table.
+            finders (dict): The finders by service. Checkers share their finders between plans,
+                so the EC2 inventory is reused.
+            args (dict): Arguments of the finder methods by check name, instead of the ones on config.yml.
+            on_check (callable): Called with each check, its findings and the regions where it failed, as soon as
+                the check completes.
+            max_rows (int): Maximum number of findings shown per check on the table output. 0 shows
+                all of them, None uses the limit on config.yml.
+            watermarks (dict): The watermark of the previous scan by (check name, region). Checks with a
+                watermark receive it as their since argument and only scan the resources past it.
+        """
+        if regions == "all":
+            regions = RegionsFinder(session).get_available_regions()
+
+        self.checks = checks
+        self.watermarks = watermarks or {}
+        self.failures = []
+        self.on_check = on_check
+        self.max_rows = config["table"]["maxRows"] if max_rows is None else max_rows
+        self.account = account
+        self.output = output
+        self.writer = writer
+        self.args = args or {}
+        self.estimator = estimator if config["savings"]["enabled"] else None
+        self.savings = SavingsSummary(account)
+        self.iterator = AWSRegionsIterator(regions, account, concurrency)
+        self.regions = self.iterator.regions
+        self.finders = finders or {
+            "ec2": EC2Finder(session),
+            "rds": RDSFinder(session),
+            "s3": S3Finder(session, concurrency=bucket_concurrency),
+        }
+
+    def get_fetches(self):
+        """
+        Lists the collections of the EC2 inventory read by more than one check, once per region.
+
+        Shared collections are fetched whole and filtered by each check on the client. The
+        other ones are fetched by their only check, with its filters pushed down to the API.
+
+        Returns:
+            list: The (service, collection, region) fetches, without duplicates.
+        """
+        readers = {}
+        for check in self.checks:
+            inventory = getattr(self.finders[check.service], "inventory", None)
+            if check.scope != "region" or inventory is None:
+                continue
+
+            for collection in check.collections:
+                if hasattr(inventory, f"get_{collection}"):
+                    readers.setdefault((check.service, collection), []).append(check.name)
+
+        fetches = []
+        for (service, collection), names in readers.items():
+            if len(names) > 1:
+                self.finders[service].inventory.share(collection)
+                fetches += [(service, collection, region) for region in self.regions]
+        return fetches
+
+    def fetch(self, service: str, collection: str, region: str):
+        """
+        Fetches a collection of the inventory. Errors are logged, the checks that read the
+        collection try again and report the error.
+        """
+        try:
+            getattr(self.finders[service].inventory, f"get_{collection}")(region)
+        except Exception as e:
+            log.warning(f"Account: {self.account} | Error fetching {service} {collection} on {region}: {e}")
+
+    def run_step(self, check, region: str):
         """
-        results = []
-        for region in self.regions:
-            log.info(f"Account: {self.account} | {operation} on {region} started!")
+        Runs a check on a region, or on the whole account when the check has the account scope.
 
-            with console.status(f"Account: {self.account} | {operation} on {region}!", spinner="aesthetic"):
-                data = func(region, *args)
+        A failing step does not stop the other ones. It is recorded on failures and has no findings.
 
-            log.info(f"Account: {self.account} | {operation} on {region} finished!")
+        Returns:
+            list: The findings, with their estimated savings.
+        """
+        func = getattr(self.finders[check.service], check.method)
+        args = self.args.get(check.name, check.get_args(config))
+
+        since = self.watermarks.get((check.name, region))
+        if since is not None:
+            func = partial(func, since=since)
+
+        try:
+            if check.scope == "account":
+                items = self.iterator.scan_region(lambda region: func(self.account, *args), check.operation, "global")
+            else:
+                items = self.iterator.scan_region(func, check.operation, region, *args)
+        except Exception as error:
+            log.error(f"Account: {self.account} | {check.operation} on {region or 'global'} failed: {error}")
+            self.failures.append((check.name, region or "global", str(error)))
+            return []
+
+        if self.estimator is not None:
+            items = self.estimator.estimate(check, items)
+        return items
+
+    def run(self):
+        """
+        Runs the plan.
 
-            if data:
-                for region_itens in data:
-                    log.debug(
-                        f"{region_itens}")
-                    results.append(region_itens)
+        Returns:
+            dict: The findings of each check, by category and check name.
+
+        Raises:
+            ScanFailed: When some steps failed, after the other ones completed.
+        """
+        collect = self.writer is None or self.output == "table"
+        results = {}
+
+        if not self.checks:
+            return results
+
+        with console.status(f"Account: {self.account} | {len(self.checks)} checks on {len(self.regions)} regions!", spinner="aesthetic"):
+            with ThreadPoolExecutor(max_workers=self.iterator.concurrency) as executor:
+                # Fetches are queued first, so the checks that share a collection wait for it instead of fetching it again
+                for fetch in self.get_fetches():
+                    executor.submit(self.fetch, *fetch)
+
+                steps = [
+                    (check, [executor.submit(self.run_step, check, region)
+                             for region in (self.regions if check.scope == "region" else [None])])
+                    for check in self.checks
+                ]
+
+                for check, futures in steps:
+                    name = (check.category, check.name)
+
+                    # Open the section of the check even when no region has findings
+                    if self.writer is not None:
+                        self.writer.write(name, [])
+
+                    # Findings with the highest savings first
+                    savings = check.savings is not None and self.estimator is not None
+                    renderer = None
+                    if self.output == "table":
+                        renderer = TableRenderer(check.title, check.description, check.documentation, self.max_rows, savings)
+
+                    data = []
+                    # Machine-readable outputs stream each region as soon as it completes, tables and
+                    # returned findings keep the regions order
+                    streaming = self.writer is not None and self.output != "table"
+                    for future in (as_completed(futures) if streaming else futures):
+                        items = future.result()
+                        self.savings.add(check, items)
+                        if self.writer is not None:
+                            self.writer.write(name, items)
+                        if renderer is not None:
+                            renderer.add(items)
+                        if collect:
+                            data.extend(items)
+
+                    if savings:
+                        data.sort(key=lambda item: item.savings or 0, reverse=True)
+
+                    results.setdefault(check.category, {})[check.name] = data
+                    if self.on_check is not None:
+                        self.on_check(check, data, [region for name, region, error in self.failures if name == check.name])
+                    if renderer is not None:
+                        renderer.show()
+
+        self.show_savings()
+        if self.failures:
+            raise ScanFailed(results, sorted(self.failures))
         return results
 
+    def show_savings(self):
+        """
+        Sends the estimated savings by region and check to the writer, or shows them as a table.
+        """
+        rows = self.savings.get_rows()
+        if not rows:
+            return
 
-class AWSCostChecker:
-    
-    def __init__(self, regions, account, output="table"):
+        if self.writer is not None:
+            self.writer.write(("savings", "summary"), rows)
+
+        if self.output == "table":
+            table = estimator.load()
+            AWSRecommendations(
+                "Estimated monthly savings",
+                f"{self.savings.get_total():.2f} {table['currency']} per month on account {self.account}. Estimated from the price table updated at {table['updatedAt']}.",
+                table["source"],
+                [dict(row, **{SAVINGS_ATTRIBUTE: f"{row[SAVINGS_ATTRIBUTE]:.2f}"}) for row in rows]
+            ).show_recommendations()
+
+
+class AWSChecker:
+    """
+    Base class of the checkers, which run the checks of the registry one at a time.
+    """
+
+    def __init__(self, regions, account, output="table", concurrency=1, bucket_concurrency=1, session=None, writer=None):
         """
-        Initializes the AWSCostChecker with a list of AWS regions.
+        Initializes the checker.
 
         Args:
             regions (str): A space-separated string of AWS region names.
+            concurrency (int): Maximum number of regions scanned at the same time.
+            bucket_concurrency (int): Maximum number of S3 buckets checked at the same time.
+            session (boto3.Session): The session of the scanned account. None uses the default session.
+            writer (OutputWriter): Streams the findings of each region. Findings are only returned
+                when there is no writer or the output is a table.
         """
+        if regions == "all":
+            regions = RegionsFinder(session).get_available_regions()
+
+        self.regions = regions
         self.account = account
         self.output = output
-        if regions == "all":
-            regions = RegionsFinder().get_available_regions()
-            
-        self.regions_iterator = AWSRegionsIterator(regions, self.account)
-        self.ec2_finder = EC2Finder()
+        self.concurrency = concurrency
+        self.writer = writer
+        self.finders = {
+            "ec2": EC2Finder(session),
+            "rds": RDSFinder(session),
+            "s3": S3Finder(session, concurrency=bucket_concurrency),
+        }
+
+    def run(self, name: str, *args):
+        """
+        Runs a single check.
+
+        Args:
+            name (str): The check name.
+            *args: Arguments of the finder method, instead of the ones on config.yml.
+
+        Returns:
+            list: The findings.
+
+        Raises:
+            ScanFailed: When the check failed on some regions.
+        """
+        check = get_check(name)
+        plan = ExecutionPlan([check], self.regions, self.account, self.output, self.concurrency,
+                             writer=self.writer, finders=self.finders, args={name: list(args)} if args else None)
+        return plan.run().get(check.category, {}).get(name, [])
+
+
+class AWSCostChecker(AWSChecker):
+
+    def __init__(self, regions, account, output="table", concurrency=1, session=None, writer=None):
+        """
+        Initializes the AWSCostChecker with a list of AWS regions.
+
+        Args:
+            regions (str): A space-separated string of AWS region names.
+            concurrency (int): Maximum number of regions scanned at the same time.
+            session (boto3.Session): The session of the scanned account. None uses the default session.
+            writer (OutputWriter): Streams the findings of each region. Findings are only returned
+                when there is no writer or the output is a table.
+        """
+        super().__init__(regions, account, output, concurrency, session=session, writer=writer)
 
     def get_gp2_volumes(self):
         """
@@ -148,48 +551,16 @@ class AWSCostChecker:
         Returns:
             list: A list of data about the GP2 volumes.
         """
-        data = self.regions_iterator.execute(
-            self.ec2_finder.get_gp2_volumes, "GET - GP2 volumes")
-        
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "Upgrade to EBS gp3 Volumes for Cost Savings and Better Performance!",
-                "We recommend migrating your AWS EBS gp2 volumes to gp3. gp3 volumes offer lower costs and enhanced performance. Refer to our documentation for guidance on transitioning.",
-                "https://aws.amazon.com/blogs/storage/migrate-your-amazon-ebs-volumes-from-gp2-to-gp3-and-save-up-to-20-on-costs/",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("gp2_volumes")
 
-    def get_volumes_on_stopped_instances(self):
+    def get_volumes_on_stopped_instances(self, min_days):
         """
         Retrieves information about all volumes attached to stopped instances across the specified AWS regions.
 
         Returns:
             list: A list of data about the volumes attached to stopped instances.
         """
-        data = self.regions_iterator.execute(
-            self.ec2_finder.get_volumes_on_stopped_instances, "GET - Volumes on stopped instances")
-
-        if self.output == "table":
-            recommendation_text = """To avoid unnecessary charges for Amazon EBS storage when your (Amazon EC2) instances are stopped, consider the following steps:
-
-        1. Take snapshots of unused EBS volumes to preserve data.
-        2. Delete active EBS volumes that are not currently needed.
-        3. Utilize EBS snapshots, which are billed at a lower rate, to retain stored information for future use.
-        4. When necessary, replace EBS volumes with the stored snapshots to reduce costs while maintaining data availability.
-    """
-
-            recommendation = AWSRecommendations(
-                "EBS Charges for Stopped EC2 Instances",
-                recommendation_text,
-                "https://aws.amazon.com/blogs/storage/migrate-your-amazon-ebs-volumes-from-gp2-to-gp3-and-save-up-to-20-on-costs/",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("volumes_on_stopped_instances", min_days)
 
     def get_detached_volumes(self):
         """
@@ -198,19 +569,7 @@ class AWSCostChecker:
         Returns:
             list: A list of data about the detached volumes.
         """
-        data = self.regions_iterator.execute(
-            self.ec2_finder.get_detached_volumes, "GET - Detached volumes")
-
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "Unused EBS Volumes",
-                "AWS suggests taking snapshots of detached volumes and then deleting them to reduce costs.",
-                "https://docs.aws.amazon.com/pt_br/ebs/latest/userguide/ebs-detaching-volume.html",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("detached_volumes")
 
     def get_detached_ips(self):
         """
@@ -219,19 +578,7 @@ class AWSCostChecker:
         Returns:
             list: A list of data about the detached IP addresses.
         """
-
-        data = self.regions_iterator.execute(
-            self.ec2_finder.get_detached_ips, "GET - Detached IP addresses")
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "Unused Elastic IPs",
-                "Release detached IPs",
-                "https://aws.amazon.com/blogs/aws/new-aws-public-ipv4-address-charge-public-ip-insights/",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("detached_ips")
 
     def get_old_snapshots(self, retention):
         """
@@ -240,38 +587,33 @@ class AWSCostChecker:
         Returns:
             list: A list of data about the old snapshots.
         """
-        data = self.regions_iterator.execute(
-            self.ec2_finder.get_old_snapshots, "GET - Old snapshots", retention)
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "Old Snapshots",
-                "Remove old snapshots and establish retention policies.",
-                "https://docs.aws.amazon.com/pt_br/ebs/latest/userguide/automating-snapshots.html",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("old_snapshots", retention)
 
+    def get_snapshot_lineage(self, keep):
+        """
+        Retrieves information about all orphaned and superseded snapshots across the specified AWS regions.
 
-class AWSSecurityChecker:
-    def __init__(self, regions, account, output="table"):
+        Returns:
+            list: A list of data about the orphaned and superseded snapshots.
+        """
+        return self.run("snapshot_lineage", keep)
+
+
+class AWSSecurityChecker(AWSChecker):
+    def __init__(self, regions, account, output="table", concurrency=1, bucket_concurrency=1, session=None, writer=None):
         """
         Initializes the AWSSecurityChecker with a list of AWS regions.
 
         Args:
             regions (str): A space-separated string of AWS region names.
+            concurrency (int): Maximum number of regions scanned at the same time.
+            bucket_concurrency (int): Maximum number of S3 buckets checked at the same time.
+            session (boto3.Session): The session of the scanned account. None uses the default session.
+            writer (OutputWriter): Streams the findings of each region. Findings are only returned
+                when there is no writer or the output is a table.
         """
-        if regions == "all":
-            regions = RegionsFinder().get_available_regions()
-                    
-        self.account = account
-        self.output = output
-        self.regions_iterator = AWSRegionsIterator(regions, self.account)
-        self.ec2_finder = EC2Finder()
-        self.s3_finder = S3Finder()
-        self.rds_finder = RDSFinder()
-        
+        super().__init__(regions, account, output, concurrency, bucket_concurrency, session, writer)
+
     def get_security_groups_public_egress(self):
         """
         Retrieves information about all public egress rules in the specified AWS regions.
@@ -279,18 +621,7 @@ class AWSSecurityChecker:
         Returns:
             list: A list of data about the public egress rules.
         """
-        data = self.regions_iterator.execute(
-            self.ec2_finder.get_security_groups_public_egress, "GET - Security groups with public egress rules")
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "Security Groups with Public Egress Rules",
-                "Remove public egress rules to improve security.",
-                "https://docs.aws.amazon.com/pt_br/vpc/latest/userguide/security-group-rules.html",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("insecure_security_groups")
 
     def get_rds_instance_publicly_accessible(self):
         """
@@ -299,18 +630,7 @@ class AWSSecurityChecker:
         Returns:
             list: A list of data about the RDS instances that are publicly accessible.
         """
-        data = self.regions_iterator.execute(
-            self.rds_finder.get_rds_instance_publicly_accessible, "GET - RDS instances that are publicly accessible")
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "RDS Instances that are Publicly Accessible",
-                "Even though public access is granted only through rules in the security group, we recommend keeping this option disabled if the database doesn't need to be accessible via the internet.",
-                "https://docs.aws.amazon.com/pt_br/AmazonRDS/latest/UserGuide/USER_VPC.WorkingWithRDSInstanceinaVPC.html#USER_VPC.Hiding",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
+        return self.run("rds_instances_publicly_accessible")
 
     def get_buckets_not_public_acess_block(self):
         """
@@ -319,18 +639,4 @@ class AWSSecurityChecker:
         Returns:
             list: A list of data about the buckets that are not public access blocked.
         """
-        log.info(f"Account: {self.account} | GET - Buckets not public access block started!")
-        with console.status(f"Account: {self.account} | GET - Buckets not public access block!", spinner="aesthetic"):        
-            data = self.s3_finder.get_buckets_not_public_acess_block()
-        log.info(f"Account: {self.account} | GET - Buckets not public access block on account finished!")
-
-        if self.output == "table":
-            recommendation = AWSRecommendations(
-                "Buckets that are not public access blocked",
-                "Check if public access blocking can be enabled on the bucket",
-                "https://docs.aws.amazon.com/AmazonS3/latest/userguide/access-control-block-public-access.html",
-                data
-            )
-
-            recommendation.show_recommendations()
-        return data
\ No newline at end of file
+        return self.run("s3_bucket_no_public_access_block")
@@ -0,0 +1,334 @@
+from datetime import datetime, timedelta, timezone
+
+from AWS import findings
+
+
+class Check:
+    """
+    Declaration of a check: what it scans, how its findings are identified and how they are presented.
+
+    Adding a check means adding a finder method and a Check to CHECKS. The CLI, the execution
+    plan, the results store, the delta mode and the dashboard are all driven by this registry.
+    """
+
+    def __init__(self, name: str, category: str, resource: str, service: str, method: str, operation: str,
+                 resource_id: str, columns: list, title: str, description: str, documentation: str,
+                 summary: str, details: str, option: tuple, collections: tuple = (), args=None, scope: str = "region",
+                 savings=None, watermark=None, compared: list = None):
+        """
+        Initializes a Check.
+
+        Args:
+            name (str): The finder name, used on the outputs and on the results store. Exemple: "gp2_volumes".
+            category (str): "costs" or "security".
+            resource (str): The resource name used by the get command. Exemple: "gp2-volumes".
+            service (str): The finder that runs the check: "ec2", "rds" or "s3".
+            method (str): The finder method that filters the findings.
+            operation (str): A description of the operation, used on logs and on the profile.
+            resource_id (str): The attribute that identifies the resource of each finding.
+            columns (list): The attributes of each finding, the output names of its record.
+            title (str): The title of the recommendation table.
+            description (str): The recommendation.
+            documentation (str): The documentation of the recommendation.
+            summary (str): A short label, used on the dashboard metrics.
+            details (str): The explanation shown on the dashboard.
+            option (tuple): The path of the flag that enables the check under finders.aws on config.yml.
+            collections (tuple): The API collections the check reads. Collections of the EC2 inventory
+                are fetched once per region and shared by all the selected checks.
+            args (callable): Receives the config and returns the additional arguments of the finder method.
+            scope (str): "region" when the check runs on each region, "account" when it runs once per account.
+            savings (callable): Receives the prices of the region and a finding record, and returns the estimated
+                monthly savings of fixing it. None when the check has no savings estimate.
+            watermark (callable): Receives the config and returns the watermark a scan reaches now. Checks with
+                a watermark accept a since argument, so --delta only describes the resources that crossed the
+                watermark of the previous scan. None when the check always scans every resource.
+            compared (list): The columns compared by the delta mode to report a finding as changed. None compares
+                every column but the savings.
+        """
+        self.name = name
+        self.category = category
+        self.resource = resource
+        self.service = service
+        self.method = method
+        self.operation = operation
+        self.resource_id = resource_id
+        self.columns = columns
+        self.title = title
+        self.description = description
+        self.documentation = documentation
+        self.summary = summary
+        self.details = details
+        self.option = option
+        self.collections = collections
+        self.args = args
+        self.scope = scope
+        self.savings = savings
+        self.watermark = watermark
+        self.compared = compared
+
+    def is_enabled(self, config: dict):
+        """
+        Checks if the check is enabled on config.yml. Checks without a flag are enabled.
+
+        Args:
+            config (dict): The loaded config.
+
+        Returns:
+            bool: True when the check is enabled.
+        """
+        value = config["finders"]["aws"]
+        for key in self.option:
+            # Flags that became a section, like volumesOnStoppedInstances, may still be a boolean on older configs
+            if not isinstance(value, dict):
+                return value == True
+            if key not in value:
+                return True
+            value = value[key]
+        return value == True
+
+    def get_args(self, config: dict):
+        """
+        Retrieves the additional arguments of the finder method.
+
+        Args:
+            config (dict): The loaded config.
+
+        Returns:
+            list: The arguments.
+        """
+        return list(self.args(config)) if self.args else []
+
+
+CHECKS = [
+    Check(
+        name="gp2_volumes",
+        category="costs",
+        resource="gp2-volumes",
+        service="ec2",
+        method="get_gp2_volumes",
+        operation="GET - GP2 volumes",
+        resource_id="VolumeId",
+        columns=list(findings.GP2Volume.columns),
+        compared=list(findings.GP2Volume.compared),
+        title="Upgrade to EBS gp3 Volumes for Cost Savings and Better Performance!",
+        description="We recommend migrating your AWS EBS gp2 volumes to gp3. gp3 volumes offer lower costs and enhanced performance. Refer to our documentation for guidance on transitioning.",
+        documentation="https://aws.amazon.com/blogs/storage/migrate-your-amazon-ebs-volumes-from-gp2-to-gp3-and-save-up-to-20-on-costs/",
+        summary="GP2 Volumes",
+        details="gp3 provides a better cost-benefit when considering the ability to adjust the IOPS rate and throughput independently, which can result in significant savings, especially for workloads that demand higher performance..",
+        option=("costs", "gp2Volumes"),
+        collections=("volumes",),
+        # Migrating to gp3 saves the price difference of the provisioned size
+        savings=lambda prices, finding: float(finding.size) * (prices["ebs"]["gp2"] - prices["ebs"]["gp3"]),
+    ),
+    Check(
+        name="volumes_on_stopped_instances",
+        category="costs",
+        resource="volumes-on-stopped-instances",
+        service="ec2",
+        method="get_volumes_on_stopped_instances",
+        operation="GET - Volumes on stopped instances",
+        resource_id="volume",
+        columns=list(findings.StoppedInstanceVolume.columns),
+        compared=list(findings.StoppedInstanceVolume.compared),
+        title="EBS Charges for Stopped EC2 Instances",
+        description="""To avoid unnecessary charges for Amazon EBS storage when your (Amazon EC2) instances are stopped, consider the following steps:
+
+        1. Take snapshots of unused EBS volumes to preserve data.
+        2. Delete active EBS volumes that are not currently needed.
+        3. Utilize EBS snapshots, which are billed at a lower rate, to retain stored information for future use.
+        4. When necessary, replace EBS volumes with the stored snapshots to reduce costs while maintaining data availability.
+    """,
+        documentation="https://aws.amazon.com/blogs/storage/migrate-your-amazon-ebs-volumes-from-gp2-to-gp3-and-save-up-to-20-on-costs/",
+        summary="Volumes on stopped instances",
+        details="One way to reduce the storage costs of stopped instances in cloud services is simply to delete them when they're not in use.",
+        option=("costs", "volumesOnStoppedInstances", "enabled"),
+        collections=("instances", "volumes"),
+        # The option was a plain flag before minStoppedDays, which means no minimum
+        args=lambda config: [settings.get("minStoppedDays", 0) if isinstance(
+            settings := config["finders"]["aws"]["costs"]["volumesOnStoppedInstances"], dict) else 0],
+        # Replacing the volume with a snapshot saves the price difference of its size, at most
+        savings=lambda prices, finding: float(finding.size) * (prices["ebs"][finding.volume_type] - prices["snapshot"]),
+    ),
+    Check(
+        name="detached_volumes",
+        category="costs",
+        resource="detached-volumes",
+        service="ec2",
+        method="get_detached_volumes",
+        operation="GET - Detached volumes",
+        resource_id="volume",
+        columns=list(findings.DetachedVolume.columns),
+        compared=list(findings.DetachedVolume.compared),
+        title="Unused EBS Volumes",
+        description="AWS suggests taking snapshots of detached volumes and then deleting them to reduce costs.",
+        documentation="https://docs.aws.amazon.com/pt_br/ebs/latest/userguide/ebs-detaching-volume.html",
+        summary="Detached Volumes",
+        details="If you find unattached volumes that are no longer needed, safely delete them. This will immediately stop incurring storage costs for those volumes.",
+        option=("costs", "detachedVolumes"),
+        collections=("volumes",),
+        savings=lambda prices, finding: float(finding.size) * prices["ebs"][finding.volume_type],
+    ),
+    Check(
+        name="detached_ips",
+        category="costs",
+        resource="detached-ips",
+        service="ec2",
+        method="get_detached_ips",
+        operation="GET - Detached IP addresses",
+        resource_id="AllocationId",
+        columns=list(findings.DetachedAddress.columns),
+        compared=list(findings.DetachedAddress.compared),
+        title="Unused Elastic IPs",
+        description="Release detached IPs",
+        documentation="https://aws.amazon.com/blogs/aws/new-aws-public-ipv4-address-charge-public-ip-insights/",
+        summary="Detached IPs",
+        details="""Free up unused IPs: After disassociating the IPs from running instances, you can release them entirely. This removes them from your AWS account and stops the costs associated with their reservation.
+
+                Automate the cleanup: Implement scripts or automation tools to regularly check and disassociate or release unused IPs. This helps ensure you're not paying for unnecessary resources.""",
+        option=("costs", "detachedIps"),
+        collections=("addresses",),
+        savings=lambda prices, finding: prices["ipv4"] * prices["hoursPerMonth"],
+    ),
+    Check(
+        name="old_snapshots",
+        category="costs",
+        resource="old-snapshots",
+        service="ec2",
+        method="get_old_snapshots",
+        operation="GET - Old snapshots",
+        resource_id="SnapshotId",
+        columns=list(findings.OldSnapshot.columns),
+        compared=list(findings.OldSnapshot.compared),
+        title="Old Snapshots",
+        description="Remove old snapshots and establish retention policies.",
+        documentation="https://docs.aws.amazon.com/pt_br/ebs/latest/userguide/automating-snapshots.html",
+        summary="Old snapshots",
+        details="""Once you've identified obsolete snapshots, safely delete them using AWS management tools or CLI commands. Make sure to double-check before deletion to avoid accidental data loss.
+
+                AWS offers lifecycle policies for Amazon EBS snapshots, allowing you to automate the process of managing snapshot retention. You can define rules to automatically delete snapshots after a certain period or based on specific criteria, such as age or number of generations.""",
+        option=("costs", "oldSnapshots", "enabled"),
+        collections=("snapshots",),
+        args=lambda config: [config["finders"]["aws"]["costs"]["oldSnapshots"]["daysOfRetention"]],
+        # Snapshots are incremental, so the size of the source volume is an upper bound of the stored data
+        savings=lambda prices, finding: float(finding.volume_size) * prices["snapshot"],
+        # Snapshots never get younger, the ones before the retention limit of the previous scan were already reported
+        watermark=lambda config: datetime.now(timezone.utc).date() - timedelta(
+            days=config["finders"]["aws"]["costs"]["oldSnapshots"]["daysOfRetention"]),
+    ),
+    Check(
+        name="snapshot_lineage",
+        category="costs",
+        resource="snapshot-lineage",
+        service="ec2",
+        method="get_snapshot_lineage",
+        operation="GET - Orphaned and superseded snapshots",
+        resource_id="SnapshotId",
+        columns=list(findings.LineageSnapshot.columns),
+        compared=list(findings.LineageSnapshot.compared),
+        title="Orphaned and Superseded Snapshots",
+        description="Delete the snapshots of volumes that no longer exist and the old snapshots of volumes that already have newer ones, after checking they are not needed for recovery.",
+        documentation="https://docs.aws.amazon.com/ebs/latest/userguide/ebs-deleting-snapshot.html",
+        summary="Orphaned snapshots",
+        details="""Orphaned snapshots belong to volumes that were deleted, so they are often forgotten backups. Superseded snapshots are older copies of volumes that have newer snapshots. Snapshots used by AMIs are not reported.
+
+                Snapshots are incremental: deleting a superseded snapshot only frees the blocks that no other snapshot references, so the savings are an upper bound.""",
+        option=("costs", "snapshotLineage", "enabled"),
+        collections=("snapshots", "volumes", "images"),
+        args=lambda config: [config["finders"]["aws"]["costs"]["snapshotLineage"]["keepPerVolume"]],
+        # The size of the source volume is an upper bound of the data only kept by the snapshot
+        savings=lambda prices, finding: float(finding.volume_size) * prices["snapshot"],
+    ),
+    Check(
+        name="insecure_security_groups",
+        category="security",
+        resource="public-egress-rules",
+        service="ec2",
+        method="get_security_groups_public_egress",
+        operation="GET - Exposed security groups",
+        resource_id="GroupId",
+        columns=list(findings.ExposedGroup.columns),
+        compared=list(findings.ExposedGroup.compared),
+        title="Security Groups Exposed to the Internet or to Broad Ranges",
+        description="Restrict the rules that open sensitive ports to the internet (0.0.0.0/0 and ::/0) or to broad ranges to the addresses that really need them.",
+        documentation="https://docs.aws.amazon.com/pt_br/vpc/latest/userguide/security-group-rules.html",
+        summary="Insecure Security Groups",
+        details="If possible, restrict access only to specific IPs or IP ranges that really need to access your cloud resources. This can be done by changing security rules to allow traffic only from trusted sources.",
+        option=("security", "insecureSecurityGroups"),
+        collections=("security_groups", "network_interfaces"),
+        args=lambda config: [config["securityGroups"]],
+    ),
+    Check(
+        name="rds_instances_publicly_accessible",
+        category="security",
+        resource="rds-publicly-accessible",
+        service="rds",
+        method="get_rds_instance_publicly_accessible",
+        operation="GET - RDS instances that are publicly accessible",
+        resource_id="DBInstanceIdentifier",
+        columns=list(findings.PublicDBInstance.columns),
+        compared=list(findings.PublicDBInstance.compared),
+        title="RDS Instances that are Publicly Accessible",
+        description="Even though public access is granted only through rules in the security group, we recommend keeping this option disabled if the database doesn't need to be accessible via the internet.",
+        documentation="https://docs.aws.amazon.com/pt_br/AmazonRDS/latest/UserGuide/USER_VPC.WorkingWithRDSInstanceinaVPC.html#USER_VPC.Hiding",
+        summary="RDS instances publicly accessible",
+        details="""If a public endpoint is not properly configured with the appropriate access controls, firewall, and other security measures, it can represent a significant vulnerability.
+
+    Ensure that security restrictions are properly enforced.""",
+        option=("security", "rdsInstancePubliclyAccessible"),
+        collections=("db_instances",),
+    ),
+    Check(
+        name="s3_bucket_no_public_access_block",
+        category="security",
+        resource="buckets-not-public-acess-block",
+        service="s3",
+        method="get_buckets_not_public_acess_block",
+        operation="GET - Buckets not public access block",
+        resource_id="Bucket",
+        columns=list(findings.PublicBucket.columns),
+        compared=list(findings.PublicBucket.compared),
+        title="Buckets that are not public access blocked",
+        description="Check if public access blocking can be enabled on the bucket",
+        documentation="https://docs.aws.amazon.com/AmazonS3/latest/userguide/access-control-block-public-access.html",
+        summary="S3 bucket no public access block",
+        details="""When all options for public access blocking are disabled on an S3 bucket (Amazon Simple Storage Service), it means that the bucket and the objects within it are configured to allow public access. This can have several implications:
+
+    Ensure that the ACL policies are configured correctly.""",
+        option=("security", "s3BucketNoPublicAccessBlock"),
+        collections=("buckets",),
+        scope="account",
+    ),
+]
+
+# Categories in the order they are scanned and shown
+CATEGORIES = ["costs", "security"]
+
+
+def get_check(name: str):
+    """
+    Retrieves a check by its finder name or by its resource name.
+
+    Args:
+        name (str): The finder name ("gp2_volumes") or the resource name ("gp2-volumes").
+
+    Returns:
+        Check: The check, or None when there is no check with that name.
+    """
+    return next((check for check in CHECKS if name in (check.name, check.resource)), None)
+
+
+def get_checks(scope: str = "all", config: dict = None):
+    """
+    Retrieves the checks of a scope, in the order they are scanned.
+
+    Args:
+        scope (str): "costs", "security" or "all".
+        config (dict): When informed, only the checks enabled on config.yml are returned.
+
+    Returns:
+        list: The checks.
+    """
+    return [
+        check for check in CHECKS
+        if scope in ("all", check.category) and (config is None or check.is_enabled(config))
+    ]
@@ -0,0 +1,219 @@
+import ipaddress
+
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+# Port range of the rules that allow every protocol
+ALL_PORTS = (0, 65535)
+
+# Protocols whose rules have a port range, by name and number
+PORT_PROTOCOLS = {"tcp": "tcp", "6": "tcp", "udp": "udp", "17": "udp"}
+
+# Severity of each exposure, the highest of a group is reported
+SEVERITIES = ["Low", "Medium", "High"]
+
+
+class PortSet:
+    """
+    Sorted set of ports, queried by range with a binary search.
+    """
+
+    def __init__(self, ports: list):
+        self.ports = sorted({int(port) for port in ports or []})
+
+    def get_overlap(self, start: int, end: int):
+        """
+        Retrieves the ports inside a range.
+
+        Args:
+            start (int): The first port of the range.
+            end (int): The last port of the range.
+
+        Returns:
+            list: The ports of the set inside the range.
+        """
+        return self.ports[bisect_left(self.ports, start):bisect_right(self.ports, end)]
+
+
+class PrefixSet:
+    """
+    Set of address ranges, kept as sorted and merged integer intervals for each IP version, so a
+    network is checked with a single binary search however many ranges there are.
+    """
+
+    def __init__(self, cidrs: list):
+        intervals = {4: [], 6: []}
+        for cidr in cidrs or []:
+            network = ipaddress.ip_network(cidr, strict=False)
+            intervals[network.version].append((int(network.network_address), int(network.broadcast_address)))
+
+        self.intervals = {}
+        for version, ranges in intervals.items():
+            merged = []
+            for start, end in sorted(ranges):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+            self.intervals[version] = merged
+
+        self.starts = {version: [start for start, end in merged] for version, merged in self.intervals.items()}
+
+    def covers(self, network):
+        """
+        Checks if a network is inside one of the ranges.
+
+        Args:
+            network (IPv4Network | IPv6Network): The network.
+
+        Returns:
+            bool: True when the whole network is inside a range.
+        """
+        index = bisect_right(self.starts[network.version], int(network.network_address)) - 1
+        return index >= 0 and self.intervals[network.version][index][1] >= int(network.broadcast_address)
+
+
+@lru_cache(maxsize=4096)
+def parse_network(cidr: str):
+    """
+    Parses a CIDR. The same ranges repeat on most groups, so they are parsed once.
+    """
+    return ipaddress.ip_network(cidr, strict=False)
+
+
+class Rule:
+    """
+    A security group rule with a single address range.
+    """
+
+    __slots__ = ("direction", "protocol", "ports", "network")
+
+    def __init__(self, direction: str, protocol: str, ports, network):
+        self.direction = direction
+        self.protocol = protocol
+        self.ports = ports
+        self.network = network
+
+
+def normalize(group: dict, egress: bool = True):
+    """
+    Flattens the permissions of a security group into one rule per address range. Rules that
+    refer to other groups or prefix lists are not evaluated, they do not open the group to ranges.
+
+    Args:
+        group (dict): The security group as returned by DescribeSecurityGroups.
+        egress (bool): Also returns the egress rules.
+
+    Returns:
+        generator: The rules.
+    """
+    permissions = [("ingress", permission) for permission in group.get("IpPermissions", [])]
+    if egress:
+        permissions += [("egress", permission) for permission in group.get("IpPermissionsEgress", [])]
+
+    for direction, permission in permissions:
+        protocol = str(permission.get("IpProtocol", "-1")).lower()
+        if protocol in ("-1", "all"):
+            protocol, ports = "all", ALL_PORTS
+        elif protocol in PORT_PROTOCOLS:
+            protocol = PORT_PROTOCOLS[protocol]
+            ports = (permission.get("FromPort", 0), permission.get("ToPort", 65535))
+        else:
+            # ICMP types and other protocols have no ports
+            ports = None
+
+        cidrs = [item["CidrIp"] for item in permission.get("IpRanges", []) if "CidrIp" in item]
+        cidrs += [item["CidrIpv6"] for item in permission.get("Ipv6Ranges", []) if "CidrIpv6" in item]
+        for cidr in cidrs:
+            yield Rule(direction, protocol, ports, parse_network(cidr))
+
+
+class SecurityGroupPolicy:
+    """
+    Evaluates the rules of the security groups against the sensitive ports and the trusted ranges.
+
+    A rule from 0.0.0.0/0 or ::/0 exposes the group to the internet. A rule from a range as wide
+    as the broad prefix lengths, like 10.0.0.0/8, exposes it to a broad range. Rules from the
+    allowed ranges are never reported.
+    """
+
+    def __init__(self, settings: dict):
+        """
+        Initializes the SecurityGroupPolicy.
+
+        Args:
+            settings (dict): The securityGroups section of config.yml.
+        """
+        self.sensitive = PortSet(settings.get("sensitivePorts"))
+        self.allowed = PrefixSet(settings.get("allowedCidrs"))
+        broad = settings.get("broadPrefixLength") or {}
+        self.broad = {4: int(broad.get("ipv4", 12)), 6: int(broad.get("ipv6", 32))}
+        self.egress = bool(settings.get("egress", False))
+        self.attached_only = bool(settings.get("attachedOnly", True))
+        self.results = {}
+
+    def evaluate_rule(self, rule: Rule):
+        """
+        Evaluates a rule.
+
+        Args:
+            rule (Rule): The rule.
+
+        Returns:
+            tuple: The severity and the description of the exposure, or None when the rule is not exposed.
+        """
+        prefix = rule.network.prefixlen
+        if prefix > self.broad[rule.network.version] or self.allowed.covers(rule.network):
+            return None
+
+        internet = prefix == 0
+        if rule.ports is None:
+            sensitive, ports = [], rule.protocol
+        elif rule.ports == ALL_PORTS:
+            sensitive, ports = [ALL_PORTS], f"{rule.protocol} traffic"
+        else:
+            start, end = rule.ports
+            sensitive = self.sensitive.get_overlap(start, end)
+            ports = ",".join(str(port) for port in sensitive) if sensitive else (str(start) if start == end else f"{start}-{end}")
+            ports = f"{rule.protocol} {ports}"
+
+        if internet and sensitive:
+            severity = "High"
+        elif (internet and rule.ports is not None) or sensitive:
+            severity = "Medium"
+        elif internet:
+            severity = "Low"
+        else:
+            return None
+
+        source = "to" if rule.direction == "egress" else "from"
+        return severity, f"{rule.direction} {ports} {source} {rule.network}"
+
+    def evaluate(self, group: dict):
+        """
+        Evaluates every rule of a security group.
+
+        Args:
+            group (dict): The security group as returned by DescribeSecurityGroups.
+
+        Returns:
+            tuple: The highest severity and the descriptions of the exposures, or None when the group is not exposed.
+        """
+        severity = None
+        exposures = []
+        for rule in normalize(group, self.egress):
+            # Groups share most of their rules, so each distinct rule is evaluated once
+            key = (rule.direction, rule.protocol, rule.ports, rule.network)
+            if key not in self.results:
+                self.results[key] = self.evaluate_rule(rule)
+            result = self.results[key]
+            if result is None:
+                continue
+            if severity is None or SEVERITIES.index(result[0]) > SEVERITIES.index(severity):
+                severity = result[0]
+            if result[1] not in exposures:
+                exposures.append(result[1])
+
+        if severity is None:
+            return None
+        return severity, exposures
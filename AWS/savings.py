@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+
+from utils.logger import log
+
+# Price table shipped with the package, used when config.yml does not point to another one
+BUNDLED_PRICES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prices.json")
+
+# Attribute added to the findings of the checks with a savings estimate
+SAVINGS_ATTRIBUTE = "MonthlySavings"
+
+
+class SavingsEstimator:
+    """
+    Estimates the monthly savings of the findings from a local price table, without any API call.
+
+    The table has a "default" price list and partial price lists per region, which override it.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Initializes the SavingsEstimator. The price table is loaded on the first estimate.
+
+        Args:
+            path (str): The JSON price table. None uses the bundled table.
+        """
+        self.path = os.path.expanduser(path) if path else BUNDLED_PRICES
+        self.table = None
+        self.prices = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Loads the price table, falling back to the bundled table when the configured one cannot be read.
+
+        Returns:
+            dict: The price table.
+        """
+        with self.lock:
+            if self.table is None:
+                try:
+                    with open(self.path, 'r') as file:
+                        self.table = json.load(file)
+                except (OSError, ValueError) as error:
+                    log.warning(f"Unable to read the price table {self.path}, using the bundled one: {error}")
+                    with open(BUNDLED_PRICES, 'r') as file:
+                        self.table = json.load(file)
+            return self.table
+
+    def get_prices(self, region: str):
+        """
+        Retrieves the price list of a region, merged over the default prices.
+
+        Args:
+            region (str): The AWS region.
+
+        Returns:
+            dict: The prices of the region.
+        """
+        if region in self.prices:
+            return self.prices[region]
+
+        table = self.load()
+        default = table["regions"]["default"]
+        override = table["regions"].get(region, {})
+
+        prices = {"hoursPerMonth": table.get("hoursPerMonth", 730)}
+        for key, value in default.items():
+            if isinstance(value, dict):
+                prices[key] = dict(value, **override.get(key, {}))
+            else:
+                prices[key] = override.get(key, value)
+
+        self.prices[region] = prices
+        return prices
+
+    def estimate(self, check, items: list):
+        """
+        Adds the estimated monthly savings to a batch of findings, sorted by the highest saving.
+
+        Prices are resolved once per region of the batch, then applied to every finding.
+
+        Args:
+            check (Check): The check that reported the findings.
+            items (list): The finding records.
+
+        Returns:
+            list: The records with their savings set.
+        """
+        if check.savings is None or not items:
+            return items
+
+        prices = {region: self.get_prices(region) for region in {item.region for item in items}}
+        for item in items:
+            try:
+                item.savings = round(check.savings(prices[item.region], item), 2)
+            except (KeyError, TypeError, ValueError) as error:
+                log.debug("Unable to estimate the savings of %r: %s", item, error)
+                item.savings = 0.0
+
+        items.sort(key=lambda item: item.savings, reverse=True)
+        return items
+
+
+class SavingsSummary:
+    """
+    Aggregates the estimated savings of a scan by region and check, as the findings are streamed.
+    """
+
+    def __init__(self, account: str):
+        self.account = account
+        self.totals = {}
+
+    def add(self, check, items: list):
+        """
+        Adds a batch of findings to the totals.
+
+        Args:
+            check (Check): The check that reported the findings.
+            items (list): The finding records, with their savings set.
+        """
+        for item in items:
+            savings = getattr(item, "savings", None)
+            if savings is None:
+                continue
+            key = (item.region, check.name)
+            count, total = self.totals.get(key, (0, 0.0))
+            self.totals[key] = (count + 1, total + savings)
+
+    def get_total(self):
+        """
+        Retrieves the estimated monthly savings of the whole account.
+
+        Returns:
+            float: The total savings.
+        """
+        return round(sum(total for count, total in self.totals.values()), 2)
+
+    def get_rows(self):
+        """
+        Retrieves the savings by region and check, the highest first, followed by the account total.
+
+        Returns:
+            list: One dictionary per region and check.
+        """
+        rows = [
+            {"Account": self.account, "Region": region, "Finder": finder, "Findings": count, SAVINGS_ATTRIBUTE: round(total, 2)}
+            for (region, finder), (count, total) in self.totals.items()
+        ]
+        rows.sort(key=lambda row: row[SAVINGS_ATTRIBUTE], reverse=True)
+
+        if rows:
+            rows.append({"Account": self.account, "Region": "all", "Finder": "all",
+                         "Findings": sum(row["Findings"] for row in rows), SAVINGS_ATTRIBUTE: self.get_total()})
+        return rows
+
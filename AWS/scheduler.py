@@ -0,0 +1,218 @@
+import threading
+import time
+
+from functools import partial
+from utils.logger import log
+
+# Error codes returned when a request is throttled
+THROTTLING_ERRORS = ["SlowDown", "Throttling", "ThrottlingException", "RequestLimitExceeded", "TooManyRequestsException"]
+
+
+class TokenBucket:
+    """
+    Token bucket that limits the request rate of a service in a region.
+
+    The rate is halved when the API throttles and grows back slowly on successful calls,
+    so the scan stays close to the API limit without staying throttled.
+    """
+
+    def __init__(self, rate: float, min_rate: float = 0.5):
+        """
+        Initializes a full TokenBucket.
+
+        Args:
+            rate (float): Maximum number of requests per second, also the bucket capacity.
+            min_rate (float): The rate is never reduced below this value.
+        """
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.tokens = max(1.0, rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available.
+        """
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttle(self):
+        """
+        Halves the rate after a throttled request.
+        """
+        with self.lock:
+            self.refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def on_success(self):
+        """
+        Increases the rate by a small step after a successful request.
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the number of requests in flight, with an adaptive limit.
+
+    The limit is halved when the API throttles and grows by one request per
+    "limit" successful calls (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, max_concurrency: int):
+        """
+        Initializes the ConcurrencyLimiter.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight.
+        """
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Waits until a request can be sent.
+        """
+        with self.condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        """
+        Finishes a request started by acquire.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    def on_throttle(self):
+        """
+        Halves the limit after a throttled request.
+        """
+        with self.condition:
+            self.limit = max(1.0, self.limit / 2)
+
+    def on_success(self):
+        """
+        Increases the limit after a successful request.
+        """
+        with self.condition:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self.condition.notify()
+
+
+class RequestScheduler:
+    """
+    Central scheduler of the AWS API requests of a scan.
+
+    Requests are limited by a token bucket and an adaptive concurrency limit per
+    (account, service, region). The limiters are applied through botocore event hooks
+    registered on every client of the client pool, so finders do not need any change.
+    Retries with exponential backoff and jitter are done by the botocore "standard" retry
+    mode configured on the clients.
+    """
+
+    def __init__(self, rates: dict, max_concurrency: int):
+        """
+        Initializes the RequestScheduler.
+
+        Args:
+            rates (dict): Requests per second by service name. The "default" key is used
+                for the services that are not listed.
+            max_concurrency (int): Maximum number of requests in flight per account, service and region.
+        """
+        self.rates = rates
+        self.max_concurrency = max_concurrency
+        self.buckets = {}
+        self.limiters = {}
+        self.lock = threading.Lock()
+
+    def install(self, pool):
+        """
+        Registers the scheduler hooks on the clients of the pool.
+
+        Args:
+            pool (ClientPool): The pool whose clients are scheduled.
+        """
+        pool.add_client_hook(self.register_client)
+
+    def get_limiters(self, key: tuple):
+        """
+        Retrieves the token bucket and the concurrency limiter of a key.
+
+        Args:
+            key (tuple): The service, region and credentials of a client.
+
+        Returns:
+            tuple: The TokenBucket and the ConcurrencyLimiter of the key.
+        """
+        with self.lock:
+            if key not in self.buckets:
+                service = key[0]
+                self.buckets[key] = TokenBucket(self.rates.get(service, self.rates["default"]))
+                self.limiters[key] = ConcurrencyLimiter(self.max_concurrency)
+            return self.buckets[key], self.limiters[key]
+
+    def register_client(self, client, key: tuple):
+        """
+        Registers the hooks of a client, bound to the limiters of its key.
+
+        Args:
+            client (botocore.client.BaseClient): The client.
+            key (tuple): The service, region and credentials of the client.
+        """
+        bucket, limiter = self.get_limiters(key)
+        events = client.meta.events
+        events.register("before-call", partial(self.before_call, limiter))
+        events.register("before-send", partial(self.before_send, bucket))
+        events.register("needs-retry", partial(self.needs_retry, bucket, limiter, key))
+        events.register("after-call", partial(self.after_call, bucket, limiter))
+        events.register("after-call-error", partial(self.after_call_error, limiter))
+
+    def before_call(self, limiter, context, **kwargs):
+        limiter.acquire()
+        context["scheduler_slot"] = True
+
+    def before_send(self, bucket, **kwargs):
+        # Emitted on every attempt, so the retries also take tokens
+        bucket.acquire()
+
+    def needs_retry(self, bucket, limiter, key, response=None, **kwargs):
+        # Only observes the attempts, returning None keeps the retry decision to botocore
+        if response is not None and response[1].get("Error", {}).get("Code") in THROTTLING_ERRORS:
+            log.debug("Throttled on %s %s, reducing the request rate to %.2f/s", key[0], key[1] or "default region", bucket.rate / 2)
+            bucket.on_throttle()
+            limiter.on_throttle()
+        return None
+
+    def after_call(self, bucket, limiter, parsed, context, **kwargs):
+        # Responses returned by other before-call handlers do not take a slot
+        if not context.pop("scheduler_slot", False):
+            return
+
+        limiter.release()
+        if parsed.get("Error", {}).get("Code") not in THROTTLING_ERRORS:
+            bucket.on_success()
+            limiter.on_success()
+
+    def after_call_error(self, limiter, context, **kwargs):
+        if context.pop("scheduler_slot", False):
+            limiter.release()
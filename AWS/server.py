@@ -0,0 +1,320 @@
+import json
+import threading
+import time
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from utils.logger import log
+from AWS.delta import get_region
+from AWS.findings import to_json
+
+
+def now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class ScanState:
+    """
+    Latest findings of the watch mode, kept in memory and shared with the HTTP API.
+
+    Every update increments the version, which the API uses as ETag, so pollers that
+    already have the latest findings get an empty "304 Not Modified" answer.
+    """
+
+    def __init__(self, account: str, regions: list, scope: str, interval: int):
+        """
+        Initializes an empty ScanState.
+
+        Args:
+            account (str): The AWS account ID.
+            regions (list): The regions scanned.
+            scope (str): What is scanned: "costs", "security" or "all".
+            interval (int): Seconds between the scans.
+        """
+        self.account = account
+        self.regions = regions
+        self.scope = scope
+        self.interval = interval
+        self.version = 0
+        self.findings = {}
+        self.savings = []
+        self.scan = {"status": "pending", "scans": 0, "startedAt": None, "finishedAt": None,
+                     "duration": None, "nextScanAt": None, "error": None}
+        self.responses = {}
+        self.lock = threading.Lock()
+
+    def start_scan(self):
+        with self.lock:
+            self.scan.update(status="running", startedAt=now(), error=None)
+            self.version += 1
+
+    def update(self, check, findings: list, failed: list = ()):
+        """
+        Replaces the findings of a check, as soon as the check completes.
+
+        The regions where the check failed keep the findings of the previous scan. They are
+        listed on "stale", with the time those findings were updated.
+
+        Args:
+            check (Check): The check.
+            findings (list): Its findings.
+            failed (list): The regions where the check failed, "global" for the checks with the account scope.
+        """
+        with self.lock:
+            updated = now()
+            stale = {}
+            previous = self.findings.get(check.category, {}).get(check.name)
+            if failed and previous:
+                kept = [
+                    item for item in previous["findings"]
+                    if "global" in failed or get_region(item) in failed
+                ]
+                findings = findings + kept
+                stale = {region: previous["stale"].get(region, previous["updatedAt"]) for region in failed}
+            elif failed:
+                stale = {region: None for region in failed}
+
+            self.findings.setdefault(check.category, {})[check.name] = {
+                "updatedAt": updated,
+                "count": len(findings),
+                "findings": findings,
+                "stale": stale,
+            }
+            self.version += 1
+
+    def finish_scan(self, duration: float, savings: list, error: str = None):
+        """
+        Registers the end of a scan. The savings of a failed scan are kept from the previous one, and so are
+        the findings of each check on the regions where it failed.
+
+        Args:
+            duration (float): The scan wall time, in seconds.
+            savings (list): The estimated savings by region and check.
+            error (str): The error message when the scan failed.
+        """
+        with self.lock:
+            self.scan.update(
+                status="failed" if error else "finished",
+                finishedAt=now(),
+                duration=round(duration, 3),
+                nextScanAt=datetime.fromtimestamp(time.time() + self.interval).isoformat(timespec="seconds"),
+                error=error,
+                scans=self.scan["scans"] + 1,
+            )
+            if not error:
+                self.savings = savings
+            self.version += 1
+
+    def get_status(self):
+        return {"account": self.account, "regions": self.regions, "scope": self.scope,
+                "interval": self.interval, "version": self.version, **self.scan}
+
+    def get_summary(self):
+        return {
+            "account": self.account,
+            "version": self.version,
+            "scan": self.scan,
+            "finders": {
+                name: {"category": category, "updatedAt": finder["updatedAt"], "count": finder["count"],
+                       "stale": finder["stale"]}
+                for category, finders in self.findings.items()
+                for name, finder in finders.items()
+            },
+            "savings": self.savings[-1]["MonthlySavings"] if self.savings else 0.0,
+        }
+
+    def get_findings(self, category=None, finder=None, region=None):
+        findings = {}
+        for category_name, finders in self.findings.items():
+            if category and category_name != category:
+                continue
+            for name, data in finders.items():
+                if finder and name != finder:
+                    continue
+                items = data["findings"]
+                if region:
+                    items = [item for item in items if get_region(item) == region]
+                findings.setdefault(category_name, {})[name] = dict(data, count=len(items), findings=items)
+        return findings
+
+    def get_response(self, path: str, params: dict):
+        """
+        Builds the JSON body of an API path, serialized once per version of the state.
+
+        Args:
+            path (str): The API path.
+            params (dict): The query string parameters.
+
+        Returns:
+            tuple: The version and the body, or None when the path does not exist.
+        """
+        key = (path, tuple(sorted(params.items())))
+        with self.lock:
+            cached = self.responses.get(key)
+            if cached and cached[0] == self.version:
+                return cached
+
+            match path.rstrip("/").split("/")[1:]:
+                case ["health"]:
+                    body = {"status": "ok"}
+                case ["status"]:
+                    body = self.get_status()
+                case ["summary"]:
+                    body = self.get_summary()
+                case ["savings"]:
+                    body = self.savings
+                case ["findings"]:
+                    body = self.get_findings(params.get("category"), params.get("finder"), params.get("region"))
+                case ["findings", finder]:
+                    body = self.get_findings(finder=finder, region=params.get("region"))
+                case _:
+                    return None
+
+            response = (self.version, json.dumps(body, default=to_json).encode())
+            # Old versions are never requested again
+            if len(self.responses) > 256:
+                self.responses = {}
+            self.responses[key] = response
+            return response
+
+
+class Watcher:
+    """
+    Re-scans the account on a schedule, reusing the warm clients and the cached metadata of the process.
+    """
+
+    def __init__(self, state: ScanState, concurrency: int):
+        """
+        Initializes the Watcher.
+
+        Args:
+            state (ScanState): Receives the findings of each scan.
+            concurrency (int): Maximum number of steps running at the same time.
+        """
+        self.state = state
+        self.concurrency = concurrency
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+
+    def scan(self):
+        """
+        Runs a scan, updating the state check by check.
+        """
+        from AWS.recommendations import ExecutionPlan
+        from AWS.registry import get_checks
+        from common import config
+
+        config = config.load_configs()
+        state = self.state
+        log.info(f"Account: {state.account} | Watch scan started!")
+        state.start_scan()
+        started = time.perf_counter()
+
+        try:
+            plan = ExecutionPlan(get_checks(state.scope, config), state.regions, state.account, output="serve",
+                                 concurrency=self.concurrency, bucket_concurrency=config["scan"]["bucketConcurrency"],
+                                 on_check=state.update)
+            plan.run()
+        except Exception as error:
+            log.error(f"Account: {state.account} | Watch scan failed: {error}")
+            state.finish_scan(time.perf_counter() - started, [], str(error))
+            return
+
+        state.finish_scan(time.perf_counter() - started, plan.savings.get_rows())
+        log.info(f"Account: {state.account} | Watch scan finished!")
+
+    def trigger(self):
+        """
+        Starts a scan now, instead of waiting for the interval.
+        """
+        self.wake.set()
+
+    def run(self):
+        """
+        Scans until stopped, waiting the interval between the end of a scan and the start of the next one.
+        """
+        while not self.stopped.is_set():
+            self.wake.clear()
+            self.scan()
+            self.wake.wait(self.state.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """
+    Read-only JSON API over the ScanState. POST /scan starts a scan.
+    """
+
+    state = None
+    watcher = None
+
+    def send_json(self, status: int, body: bytes, version=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if version is not None:
+            self.send_header("ETag", f'"{version}"')
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        response = self.state.get_response(url.path, params)
+        if response is None:
+            self.send_json(404, b'{"error": "not found"}')
+            return
+
+        version, body = response
+        if self.headers.get("If-None-Match") == f'"{version}"':
+            self.send_response(304)
+            self.send_header("ETag", f'"{version}"')
+            self.end_headers()
+            return
+        self.send_json(200, body, version)
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/scan":
+            self.send_json(404, b'{"error": "not found"}')
+            return
+
+        self.watcher.trigger()
+        self.send_json(202, b'{"status": "scheduled"}')
+
+    def log_message(self, format, *args):
+        log.debug("HTTP %s " + format, self.address_string(), *args)
+
+
+def serve(state: ScanState, watcher: Watcher, host: str, port: int):
+    """
+    Starts the watcher on a background thread and serves the HTTP API until interrupted.
+
+    Args:
+        state (ScanState): The state shared by the watcher and the API.
+        watcher (Watcher): The watcher.
+        host (str): The address the API listens on.
+        port (int): The port the API listens on.
+
+    Returns:
+        ThreadingHTTPServer: The server, after it is shut down.
+    """
+    handler = type("Handler", (APIHandler,), {"state": state, "watcher": watcher})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=watcher.run, name="revise-watcher", daemon=True)
+    thread.start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        server.server_close()
+    return server
@@ -0,0 +1,332 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from datetime import datetime
+from AWS.delta import RESOURCE_IDS, get_region
+from AWS.findings import to_json
+from AWS.registry import CATEGORIES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    regions TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scan_runs_account ON scan_runs (account, started_at);
+
+CREATE TABLE IF NOT EXISTS scan_finders (
+    scan_id INTEGER NOT NULL REFERENCES scan_runs (id),
+    category TEXT NOT NULL,
+    finder TEXT NOT NULL,
+    findings INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scan_id, finder)
+);
+"""
+
+FINDER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {finder} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER NOT NULL REFERENCES scan_runs (id),
+    account TEXT NOT NULL,
+    region TEXT,
+    resource_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {finder}_scan ON {finder} (scan_id);
+CREATE INDEX IF NOT EXISTS {finder}_account_region ON {finder} (account, region);
+CREATE INDEX IF NOT EXISTS {finder}_resource ON {finder} (resource_id);
+"""
+
+
+class ResultsStore:
+    """
+    Local SQLite database with the findings of every scan.
+
+    Each finder has its own table, indexed by scan, account, region and resource id.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens the database, creating it when needed.
+
+        Args:
+            path (str): The database file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.finders = set()
+
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def create_finder_table(self, finder: str):
+        """
+        Creates the table of a finder on its first use.
+
+        Args:
+            finder (str): The finder name, for example "gp2_volumes".
+        """
+        if finder in self.finders:
+            return
+
+        # Finder names become table names, so only identifiers are accepted
+        if not re.fullmatch(r"[a-z][a-z0-9_]*", finder):
+            raise ValueError(f"Invalid finder name: {finder}")
+
+        self.connection.executescript(FINDER_SCHEMA.format(finder=finder))
+        self.finders.add(finder)
+
+    def start_scan(self, account: str, regions=None):
+        """
+        Registers a new scan run.
+
+        Args:
+            account (str): The AWS account ID.
+            regions (list): The regions scanned.
+
+        Returns:
+            int: The ID of the scan run.
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO scan_runs (account, regions, started_at, status) VALUES (?, ?, ?, ?)",
+                (account, json.dumps(regions), datetime.now().isoformat(timespec="seconds"), "running")
+            )
+            return cursor.lastrowid
+
+    def finish_scan(self, scan_id: int, status="finished"):
+        """
+        Marks a scan run as finished.
+
+        Args:
+            scan_id (int): The ID of the scan run.
+            status (str): The final status of the scan run.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE scan_runs SET finished_at = ?, status = ? WHERE id = ?",
+                (datetime.now().isoformat(timespec="seconds"), status, scan_id)
+            )
+
+    def insert(self, scan_id: int, account: str, name: tuple, items: list):
+        """
+        Inserts the findings of a finder with a single batched statement.
+
+        Args:
+            scan_id (int): The ID of the scan run.
+            account (str): The AWS account ID.
+            name (tuple): The category and the finder of the findings.
+            items (list): The findings.
+        """
+        category, finder = name
+        rows = [
+            (scan_id, account, get_region(item), str(item.get(RESOURCE_IDS.get(finder), "")), json.dumps(item, default=to_json))
+            for item in items
+        ]
+
+        with self.lock, self.connection:
+            self.create_finder_table(finder)
+            self.connection.execute(
+                "INSERT OR IGNORE INTO scan_finders (scan_id, category, finder) VALUES (?, ?, ?)",
+                (scan_id, category, finder)
+            )
+            if rows:
+                self.connection.executemany(
+                    f"INSERT INTO {finder} (scan_id, account, region, resource_id, data) VALUES (?, ?, ?, ?, ?)", rows)
+                self.connection.execute(
+                    "UPDATE scan_finders SET findings = findings + ? WHERE scan_id = ? AND finder = ?",
+                    (len(rows), scan_id, finder)
+                )
+
+    def get_scans(self, account: str = None, limit: int = 20):
+        """
+        Retrieves the most recent scan runs.
+
+        Args:
+            account (str): Only scans of this account. None returns every account.
+            limit (int): Maximum number of scan runs.
+
+        Returns:
+            list: One dictionary per scan run, with the number of findings of each finder.
+        """
+        query = "SELECT * FROM scan_runs"
+        params = []
+        if account:
+            query += " WHERE account = ?"
+            params.append(account)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            scans = [dict(row) for row in self.connection.execute(query, params)]
+            for scan in scans:
+                scan["finders"] = {
+                    row["finder"]: row["findings"]
+                    for row in self.connection.execute(
+                        "SELECT finder, findings FROM scan_finders WHERE scan_id = ? ORDER BY rowid", (scan["id"],))
+                }
+        return scans
+
+    def get_latest_scan(self, account: str = None):
+        """
+        Retrieves the ID of the most recent finished scan run.
+
+        Args:
+            account (str): Only scans of this account. None considers every account.
+
+        Returns:
+            int: The ID of the scan run, or None when there is no scan.
+        """
+        query = "SELECT id FROM scan_runs WHERE status = 'finished'"
+        params = []
+        if account:
+            query += " AND account = ?"
+            params.append(account)
+
+        with self.lock:
+            row = self.connection.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return row["id"] if row else None
+
+    def get_findings(self, scan_id: int, finder: str, region: str = None):
+        """
+        Retrieves the findings of a finder on a scan run.
+
+        Args:
+            scan_id (int): The ID of the scan run.
+            finder (str): The finder name.
+            region (str): Only findings of this region. None returns every region.
+
+        Returns:
+            list: The findings.
+        """
+        # Only existing tables are queried, so the finder name is always a valid identifier
+        if not self.has_table(finder):
+            return []
+
+        query = f"SELECT data FROM {finder} WHERE scan_id = ?"
+        params = [scan_id]
+        if region:
+            query += " AND region = ?"
+            params.append(region)
+
+        with self.lock:
+            return [json.loads(row["data"]) for row in self.connection.execute(query + " ORDER BY id", params)]
+
+    def has_table(self, finder: str):
+        """
+        Checks if a finder already has a table.
+
+        Args:
+            finder (str): The finder name.
+
+        Returns:
+            bool: True when the table exists.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (finder,)).fetchone()
+        return row is not None
+
+    def get_savings(self, scan_id: int):
+        """
+        Retrieves the estimated monthly savings of a scan run by region and finder.
+
+        Args:
+            scan_id (int): The ID of the scan run.
+
+        Returns:
+            list: One dictionary per region and finder with findings that have a savings estimate, the highest first.
+        """
+        rows = []
+        for finder in [name for names in self.get_finders(scan_id).values() for name in names]:
+            if not self.has_table(finder):
+                continue
+
+            with self.lock:
+                rows += [
+                    dict(row) for row in self.connection.execute(
+                        f"SELECT region, ? AS finder, COUNT(*) AS findings, ROUND(SUM(json_extract(data, '$.MonthlySavings')), 2) AS savings "
+                        f"FROM {finder} WHERE scan_id = ? AND json_extract(data, '$.MonthlySavings') IS NOT NULL GROUP BY region",
+                        (finder, scan_id))
+                ]
+        return sorted(rows, key=lambda row: row["savings"], reverse=True)
+
+    def get_finders(self, scan_id: int):
+        """
+        Retrieves the finders executed on a scan run, grouped by category.
+
+        Args:
+            scan_id (int): The ID of the scan run.
+
+        Returns:
+            dict: The finders of each category.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT category, finder FROM scan_finders WHERE scan_id = ? ORDER BY rowid", (scan_id,)).fetchall()
+
+        finders = {}
+        for row in rows:
+            finders.setdefault(row["category"], []).append(row["finder"])
+        return finders
+
+    def get_report(self, scan_id: int):
+        """
+        Retrieves every finding of a scan run, with the same layout of data.json.
+
+        Args:
+            scan_id (int): The ID of the scan run.
+
+        Returns:
+            dict: The findings grouped by category and finder.
+        """
+        return {
+            category: {finder: self.get_findings(scan_id, finder) for finder in finders}
+            for category, finders in self.get_finders(scan_id).items()
+        }
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+
+class StoreWriter:
+    """
+    Writer that saves the findings of a scan run on the results store, region by region.
+    """
+
+    def __init__(self, store: ResultsStore, account: str, regions=None):
+        """
+        Starts a new scan run on the store.
+
+        Args:
+            store (ResultsStore): The results store.
+            account (str): The AWS account ID.
+            regions (list): The regions scanned.
+        """
+        self.store = store
+        self.account = account
+        self.scan_id = store.start_scan(account, regions)
+        self.status = "finished"
+
+    def write(self, name: tuple, items: list):
+        # Only findings are saved, summaries like the savings are computed from them
+        if name[0] not in CATEGORIES:
+            return
+        self.store.insert(self.scan_id, self.account, name, items)
+
+    def close(self):
+        self.store.finish_scan(self.scan_id, self.status)
@@ -0,0 +1,290 @@
+import fnmatch
+import random
+import re
+import threading
+import time
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import boto3
+
+# Maximum items returned per page by the fake Describe* operations
+PAGE_SIZE = 1000
+
+PUBLIC_ACCESS_BLOCK_OPTIONS = ["BlockPublicAcls", "IgnorePublicAcls", "BlockPublicPolicy", "RestrictPublicBuckets"]
+
+
+class SyntheticAccount:
+    """
+    Generates the resources of a fake AWS account.
+
+    Every region gets the same amount of each resource, with a mix of attributes so
+    every finder has something to report.
+    """
+
+    def __init__(self, regions=4, volumes=200, snapshots=1000, instances=50, security_groups=100,
+                 addresses=20, db_instances=10, buckets=100, seed=42):
+        """
+        Initializes the SyntheticAccount.
+
+        Args:
+            regions (int): Number of regions.
+            volumes (int): EBS volumes per region.
+            snapshots (int): EBS snapshots per region.
+            instances (int): EC2 instances per region.
+            security_groups (int): Security groups per region.
+            addresses (int): Elastic IPs per region.
+            db_instances (int): RDS instances per region.
+            buckets (int): S3 buckets of the account.
+            seed (int): Seed of the random generator, so runs are comparable.
+        """
+        self.account = "123456789012"
+        self.regions = [f"region-{index:02d}" for index in range(regions)]
+        self.random = random.Random(seed)
+        self.resources = {region: self.generate_region(
+            region, volumes, snapshots, instances, security_groups, addresses, db_instances)
+            for region in self.regions}
+        self.buckets = [
+            {"Name": f"bucket-{index:05d}", "Region": self.random.choice(self.regions),
+             "Block": self.random.choice([None, True, False])}
+            for index in range(buckets)
+        ]
+
+    def generate_region(self, region, volumes, snapshots, instances, security_groups, addresses, db_instances):
+        now = datetime.now(timezone.utc)
+        resources = {}
+
+        resources["Instances"] = [
+            {
+                "InstanceId": f"i-{region}-{index:06d}",
+                "State": {"Name": self.random.choice(["running", "stopped"])},
+                "StateTransitionReason": f"User initiated ({(now - timedelta(days=self.random.randint(1, 90))):%Y-%m-%d %H:%M:%S} GMT)",
+                "BlockDeviceMappings": [],
+            }
+            for index in range(instances)
+        ]
+
+        resources["Volumes"] = []
+        for index in range(volumes):
+            volume = {
+                "VolumeId": f"vol-{region}-{index:06d}",
+                "VolumeType": self.random.choice(["gp2", "gp3", "io1", "st1"]),
+                "Size": self.random.choice([8, 20, 100, 500]),
+                "AvailabilityZone": f"{region}a",
+                "State": "available",
+                "Attachments": [],
+            }
+            if resources["Instances"] and self.random.random() < 0.7:
+                instance = self.random.choice(resources["Instances"])
+                device = f"/dev/sd{chr(ord('f') + len(instance['BlockDeviceMappings']) % 20)}"
+                instance["BlockDeviceMappings"].append({"DeviceName": device, "Ebs": {"VolumeId": volume["VolumeId"]}})
+                volume["State"] = "in-use"
+                volume["Attachments"] = [{"InstanceId": instance["InstanceId"], "Device": device}]
+            resources["Volumes"].append(volume)
+
+        resources["Snapshots"] = [
+            {
+                "SnapshotId": f"snap-{region}-{index:06d}",
+                "VolumeId": self.random.choice(resources["Volumes"])["VolumeId"] if resources["Volumes"] and self.random.random() < 0.8 else f"vol-deleted-{index:06d}",
+                "VolumeSize": self.random.choice([8, 20, 100]),
+                "StartTime": now - timedelta(days=self.random.randint(0, 365)),
+                "State": "completed",
+            }
+            for index in range(snapshots)
+        ]
+
+        resources["SecurityGroups"] = [
+            {
+                "GroupId": f"sg-{region}-{index:06d}",
+                "GroupName": f"group-{index}",
+                "VpcId": f"vpc-{region}",
+                "IpPermissions": [{
+                    "IpProtocol": "tcp",
+                    "FromPort": port,
+                    "ToPort": port,
+                    "IpRanges": [{"CidrIp": self.random.choice(["0.0.0.0/0", "10.0.0.0/8", "192.168.1.0/24"])}],
+                    "Ipv6Ranges": [],
+                } for port in self.random.sample([22, 80, 443, 3306, 5432, 3389], 2)],
+                "IpPermissionsEgress": [{"IpProtocol": "-1", "IpRanges": [{"CidrIp": "0.0.0.0/0"}], "Ipv6Ranges": []}],
+            }
+            for index in range(security_groups)
+        ]
+
+        resources["NetworkInterfaces"] = [
+            {"NetworkInterfaceId": f"eni-{region}-{index:06d}", "Groups": [{"GroupId": group["GroupId"]}]}
+            for index, group in enumerate(resources["SecurityGroups"]) if self.random.random() < 0.5
+        ]
+
+        resources["Addresses"] = [
+            dict({"PublicIp": f"198.51.100.{index % 256}", "AllocationId": f"eipalloc-{region}-{index:06d}", "Domain": "vpc"},
+                 **({"NetworkInterfaceId": f"eni-{index}", "AssociationId": f"eipassoc-{index}"} if self.random.random() < 0.5 else {}))
+            for index in range(addresses)
+        ]
+
+        resources["Images"] = [
+            {"ImageId": f"ami-{region}-{index:06d}",
+             "BlockDeviceMappings": [{"DeviceName": "/dev/sda1", "Ebs": {"SnapshotId": snapshot["SnapshotId"]}}]}
+            for index, snapshot in enumerate(resources["Snapshots"][:len(resources["Snapshots"]) // 20])
+        ]
+
+        resources["DBInstances"] = [
+            {"DBInstanceIdentifier": f"db-{index}", "PubliclyAccessible": self.random.random() < 0.3}
+            for index in range(db_instances)
+        ]
+        return resources
+
+
+# Fake filters supported by the Describe* operations, by filter name
+FILTERS = {
+    "volume-type": lambda item: [item.get("VolumeType")],
+    "volume-id": lambda item: [item.get("VolumeId")],
+    "status": lambda item: [item.get("State")],
+    "instance-state-name": lambda item: [item.get("State", {}).get("Name")],
+    "domain": lambda item: [item.get("Domain")],
+    "start-time": lambda item: [item["StartTime"].strftime("%Y-%m-%dT%H:%M:%S.000Z")],
+    "ip-permission.cidr": lambda item: [r["CidrIp"] for p in item.get("IpPermissions", []) for r in p.get("IpRanges", [])],
+}
+
+
+def apply_filters(items, filters):
+    for item_filter in filters or []:
+        getter = FILTERS.get(item_filter["Name"])
+        if getter is not None:
+            # Filter values accept the "*" and "?" wildcards
+            pattern = re.compile("|".join(fnmatch.translate(value) for value in item_filter["Values"]))
+            items = [item for item in items if any(pattern.match(str(value)) for value in getter(item))]
+    return items
+
+
+def paginate(items, params, key):
+    start = int(params.get("NextToken") or 0)
+    size = min(int(params.get("MaxResults") or PAGE_SIZE), PAGE_SIZE)
+    response = {key: items[start:start + size]}
+    if start + size < len(items):
+        response["NextToken"] = str(start + size)
+    return response
+
+
+class FakeAWS:
+    """
+    Answers boto3 calls from a SyntheticAccount, without any network access.
+
+    The handlers are registered on the botocore events of a session, so the whole
+    boto3 stack runs (parameter validation, paginators, retries) except the HTTP request.
+    """
+
+    def __init__(self, account: SyntheticAccount, latency=0.0):
+        """
+        Initializes the FakeAWS.
+
+        Args:
+            account (SyntheticAccount): The fake account.
+            latency (float): Seconds added to every API call.
+        """
+        self.account = account
+        self.latency = latency
+        self.calls = Counter()
+        self.filtered = {}
+        self.lock = threading.Lock()
+
+    def install(self):
+        """
+        Replaces the default boto3 session by a session answered by the fake account.
+
+        Returns:
+            boto3.Session: The fake session.
+        """
+        session = boto3.Session(aws_access_key_id="benchmark", aws_secret_access_key="benchmark", region_name="us-east-1")
+        session.events.register("before-parameter-build", self.save_params)
+        session.events.register("before-call", self.handle)
+        boto3.DEFAULT_SESSION = session
+        return session
+
+    def save_params(self, params, context, **kwargs):
+        # The serialized request is hard to read, so the original parameters are kept on the context
+        context["benchmark_params"] = dict(params)
+
+    def handle(self, model, context, **kwargs):
+        operation = model.name
+        with self.lock:
+            self.calls[operation] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        params = context.get("benchmark_params", {})
+        region = context.get("client_region")
+        status, response = self.respond(operation, params, region)
+        http = SimpleNamespace(status_code=status, headers={}, raw=None, content=b"")
+        response.setdefault("ResponseMetadata", {"HTTPStatusCode": status, "HTTPHeaders": {}})
+        return http, response
+
+    def filter(self, region, resources, key, filters):
+        # Every page of a paginated call filters the same items, so the filtered list is kept
+        cache_key = (region, key, repr(filters))
+        if cache_key not in self.filtered:
+            self.filtered[cache_key] = apply_filters(resources[key], filters)
+        return self.filtered[cache_key]
+
+    def error(self, code):
+        return 400, {"Error": {"Code": code, "Message": code}}
+
+    def respond(self, operation, params, region):
+        account = self.account
+        resources = account.resources.get(region, account.resources[account.regions[0]])
+
+        match operation:
+            case "GetCallerIdentity":
+                return 200, {"Account": account.account}
+            case "ListRegions":
+                return 200, {"Regions": [{"RegionName": name} for name in account.regions]}
+            case "AssumeRole":
+                return 200, {"Credentials": {"AccessKeyId": "benchmark", "SecretAccessKey": "benchmark",
+                                             "SessionToken": "benchmark", "Expiration": datetime.now(timezone.utc)}}
+            case "DescribeVolumes":
+                items = self.filter(region, resources, "Volumes", params.get("Filters"))
+                if params.get("VolumeIds"):
+                    ids = set(params["VolumeIds"])
+                    items = [item for item in items if item["VolumeId"] in ids]
+                return 200, paginate(items, params, "Volumes")
+            case "DescribeSnapshots":
+                items = self.filter(region, resources, "Snapshots", params.get("Filters"))
+                return 200, paginate(items, params, "Snapshots")
+            case "DescribeInstances":
+                items = self.filter(region, resources, "Instances", params.get("Filters"))
+                response = paginate(items, params, "Instances")
+                response["Reservations"] = [{"Instances": response.pop("Instances")}]
+                return 200, response
+            case "DescribeAddresses":
+                return 200, {"Addresses": self.filter(region, resources, "Addresses", params.get("Filters"))}
+            case "DescribeSecurityGroups":
+                items = self.filter(region, resources, "SecurityGroups", params.get("Filters"))
+                return 200, paginate(items, params, "SecurityGroups")
+            case "DescribeNetworkInterfaces":
+                return 200, paginate(resources["NetworkInterfaces"], params, "NetworkInterfaces")
+            case "DescribeImages":
+                return 200, {"Images": resources["Images"]}
+            case "DescribeDBInstances":
+                response = paginate(resources["DBInstances"], {"NextToken": params.get("Marker"), "MaxResults": params.get("MaxRecords")}, "DBInstances")
+                if "NextToken" in response:
+                    response["Marker"] = response.pop("NextToken")
+                return 200, response
+            case "ListBuckets":
+                return 200, {"Buckets": [{"Name": bucket["Name"]} for bucket in account.buckets]}
+            case "GetBucketLocation":
+                bucket = self.get_bucket(params["Bucket"])
+                return 200, {"LocationConstraint": bucket["Region"]}
+            case "GetPublicAccessBlock":
+                if "AccountId" in params:
+                    return self.error("NoSuchPublicAccessBlockConfiguration")
+                block = self.get_bucket(params["Bucket"])["Block"]
+                if block is None:
+                    return self.error("NoSuchPublicAccessBlockConfiguration")
+                return 200, {"PublicAccessBlockConfiguration": dict.fromkeys(PUBLIC_ACCESS_BLOCK_OPTIONS, block)}
+            case _:
+                return 200, {}
+
+    def get_bucket(self, name):
+        return next(bucket for bucket in self.account.buckets if bucket["Name"] == name)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks of the scan engine.
+
+Runs the checkers and each finder against a synthetic account answered by FakeAWS,
+so performance changes can be measured without network access or AWS credentials.
+
+Exemple:
+    python -m benchmarks.run --regions 17 --volumes 2000 --snapshots 20000 --latency 0.05
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import typer
+from typing_extensions import Annotated
+from rich.console import Console
+from rich.table import Table, box
+
+from benchmarks.fake_aws import FakeAWS, SyntheticAccount
+
+# Initialize Rich Console for better terminal output formatting
+console = Console()
+if not console.is_terminal:
+    console.width = 140
+
+# Create a Typer application instance
+app = typer.Typer()
+
+
+def get_scenarios(account: SyntheticAccount, concurrency: int, bucket_concurrency: int, retention: int, keep: int):
+    """
+    Builds the benchmark scenarios.
+
+    Args:
+        account (SyntheticAccount): The fake account.
+        concurrency (int): Maximum number of regions scanned at the same time.
+        bucket_concurrency (int): Maximum number of S3 buckets checked at the same time.
+        retention (int): Days of retention of the old snapshots finder.
+        keep (int): Snapshots kept per volume by the snapshot lineage finder.
+
+    Returns:
+        dict: Functions that run each scenario, by name.
+    """
+    from AWS import commands
+    from AWS.finder import EC2Finder, RDSFinder, S3Finder
+    from AWS.recommendations import AWSCostChecker, AWSSecurityChecker, ExecutionPlan
+    from AWS.registry import CHECKS
+    from AWS.store import ResultsStore
+
+    regions = account.regions
+    account_id = account.account
+
+    def finder(method, *args):
+        # Each scenario gets new finders, so the EC2 inventory is not reused between scenarios
+        check = next(check for check in CHECKS if check.method == method[1])
+
+        def run():
+            plan = ExecutionPlan([check], regions, account_id, output="benchmark", concurrency=concurrency,
+                                 finders={check.service: method[0]()}, args={check.name: list(args)} if args else None)
+            return len(plan.run()[check.category][check.name])
+        return run
+
+    def checker(checker_class, methods, **kwargs):
+        def run():
+            instance = checker_class(regions, account_id, output="benchmark", concurrency=concurrency, **kwargs)
+            return sum(len(getattr(instance, name)(*args)) for name, args in methods)
+        return run
+
+    def check_all():
+        commands.check_all(regions, "benchmark", concurrency)
+
+        # Findings are streamed to the results store instead of returned
+        store = ResultsStore(commands.config["store"]["path"])
+        scan = store.get_scans(limit=1)[0]
+        store.close()
+        return sum(scan["finders"].values())
+
+    return {
+        "EC2Finder.get_gp2_volumes": finder((EC2Finder, "get_gp2_volumes")),
+        "EC2Finder.get_volumes_on_stopped_instances": finder((EC2Finder, "get_volumes_on_stopped_instances")),
+        "EC2Finder.get_detached_volumes": finder((EC2Finder, "get_detached_volumes")),
+        "EC2Finder.get_detached_ips": finder((EC2Finder, "get_detached_ips")),
+        "EC2Finder.get_old_snapshots": finder((EC2Finder, "get_old_snapshots"), retention),
+        "EC2Finder.get_snapshot_lineage": finder((EC2Finder, "get_snapshot_lineage"), keep),
+        "EC2Finder.get_security_groups_public_egress": finder((EC2Finder, "get_security_groups_public_egress")),
+        "RDSFinder.get_rds_instance_publicly_accessible": finder((RDSFinder, "get_rds_instance_publicly_accessible")),
+        "S3Finder.get_buckets_not_public_acess_block": lambda: len(list(
+            S3Finder(concurrency=bucket_concurrency).get_buckets_not_public_acess_block(account_id))),
+        "AWSCostChecker": checker(
+            AWSCostChecker, [("get_gp2_volumes", ()), ("get_volumes_on_stopped_instances", (0,)),
+                             ("get_detached_volumes", ()), ("get_detached_ips", ()), ("get_old_snapshots", (retention,)),
+                             ("get_snapshot_lineage", (keep,))]),
+        "AWSSecurityChecker": checker(
+            AWSSecurityChecker, [("get_security_groups_public_egress", ()),
+                                 ("get_rds_instance_publicly_accessible", ()), ("get_buckets_not_public_acess_block", ())],
+            bucket_concurrency=bucket_concurrency),
+        "check_all": check_all,
+    }
+
+
+def measure(fake: FakeAWS, scenario, memory: bool):
+    """
+    Runs a scenario measuring wall time, API calls and peak memory.
+
+    Args:
+        fake (FakeAWS): The fake AWS that answers the calls.
+        scenario (callable): The scenario.
+        memory (bool): Traces the peak memory. Tracing makes the scenario slower.
+
+    Returns:
+        dict: The measurements.
+    """
+    fake.calls.clear()
+    if memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    findings = scenario()
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"time": elapsed, "calls": sum(fake.calls.values()), "peak": peak, "findings": findings}
+
+
+def measure_startup(runs: int = 5):
+    """
+    Measures the wall time of "revise.py version", the cost of starting the CLI.
+
+    Args:
+        runs (int): Number of runs, the best one is reported.
+
+    Returns:
+        float: The best wall time, in seconds.
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "revise.py", "version"], check=True, capture_output=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@app.command()
+def main(regions: Annotated[int, typer.Option(help='Number of regions of the synthetic account.')] = 4,
+         volumes: Annotated[int, typer.Option(help='EBS volumes per region.')] = 200,
+         snapshots: Annotated[int, typer.Option(help='EBS snapshots per region.')] = 1000,
+         instances: Annotated[int, typer.Option(help='EC2 instances per region.')] = 50,
+         security_groups: Annotated[int, typer.Option(help='Security groups per region.')] = 100,
+         buckets: Annotated[int, typer.Option(help='S3 buckets of the account.')] = 100,
+         latency: Annotated[float, typer.Option(help='Seconds added to every API call.')] = 0.0,
+         concurrency: Annotated[int, typer.Option(help='Maximum number of regions scanned at the same time.')] = 8,
+         scenario: Annotated[str, typer.Option(help='Only scenarios whose name contains this text.')] = None,
+         memory: Annotated[bool, typer.Option(help='Trace the peak memory of each scenario.')] = True,
+         warmup: Annotated[bool, typer.Option(help='Run check_all once before measuring, so clients and service models are loaded.')] = True,
+         startup_budget: Annotated[float, typer.Option(help='Maximum seconds for "revise.py version". Fails when exceeded.')] = None):
+    """
+    Runs the offline benchmarks and prints a summary table.
+    """
+    from common.config import load_configs
+    from AWS import recommendations
+    from AWS.clients import pool
+    from AWS.commom import metadata_cache
+    from utils import logger
+
+    config = load_configs()
+
+    # Nothing is read from or written to the real cache, results store and log file
+    metadata_cache.configure(enabled=False)
+    directory = tempfile.mkdtemp()
+    config["store"]["path"] = os.path.join(directory, "results.db")
+    config["logs"]["file"] = os.path.join(directory, "revise.log")
+    logger.configure(config["logs"])
+    recommendations.console.quiet = True
+
+    account = SyntheticAccount(regions, volumes, snapshots, instances, security_groups, buckets=buckets)
+    fake = FakeAWS(account, latency)
+    fake.install()
+    pool.clear()
+
+    retention = config["finders"]["aws"]["costs"]["oldSnapshots"]["daysOfRetention"]
+    keep = config["finders"]["aws"]["costs"]["snapshotLineage"]["keepPerVolume"]
+    scenarios = get_scenarios(account, concurrency, config["scan"]["bucketConcurrency"], retention, keep)
+    if warmup:
+        scenarios["check_all"]()
+
+    table = Table(
+        title=f"[bold purple]Benchmarks ({regions} regions, {latency * 1000:.0f} ms latency, concurrency {concurrency})",
+        show_header=True, box=box.ROUNDED, title_justify='left'
+    )
+    for column in ["Scenario", "Wall time (s)", "API calls", "Peak memory (MiB)", "Findings"]:
+        table.add_column(column)
+
+    for name, run in scenarios.items():
+        if scenario and scenario not in name:
+            continue
+        result = measure(fake, run, memory)
+        peak = f"{result['peak'] / 1024 / 1024:.1f}" if result["peak"] is not None else "-"
+        table.add_row(name, f"{result['time']:.3f}", str(result["calls"]), peak, str(result["findings"]))
+
+    console.print(table)
+
+    startup = measure_startup()
+    console.print(f"Startup (revise.py version): {startup:.3f} s")
+    if startup_budget is not None and startup > startup_budget:
+        console.print(f"[red]Startup time over the budget of {startup_budget:.3f} s")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from utils.logger import log
+
+
+class MetadataCache:
+    """
+    Small on-disk cache with TTL, used for metadata that rarely changes between runs.
+    """
+
+    def __init__(self, path: str, ttl: int, enabled=True):
+        """
+        Initializes the MetadataCache.
+
+        Args:
+            path (str): The JSON file where the cache is stored.
+            ttl (int): Time to live of the entries, in seconds.
+            enabled (bool): When False the cache is never read or written.
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.enabled = enabled
+        self.refresh = False
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def configure(self, enabled=True, refresh=False):
+        """
+        Changes how the cache is used by the current run.
+
+        Args:
+            enabled (bool): When False the cache is bypassed.
+            refresh (bool): When True cached entries are ignored and replaced by new values.
+        """
+        self.enabled = enabled
+        self.refresh = refresh
+
+    def load(self):
+        """
+        Loads the cache file once per process.
+
+        Returns:
+            dict: The cache entries.
+        """
+        if self.entries is None:
+            try:
+                with open(self.path, 'r') as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    def get(self, key: str):
+        """
+        Retrieves a value from the cache.
+
+        Args:
+            key (str): The entry key.
+
+        Returns:
+            The cached value, or None when it is missing, expired or the cache is bypassed.
+        """
+        if not self.enabled or self.refresh:
+            return None
+
+        with self.lock:
+            entry = self.load().get(key)
+
+        if entry is None or time.time() - entry["time"] > self.ttl:
+            return None
+
+        log.debug("Cache hit: %s", key)
+        return entry["value"]
+
+    def set(self, key: str, value):
+        """
+        Stores a value in the cache.
+
+        Args:
+            key (str): The entry key.
+            value: A JSON serializable value.
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            now = time.time()
+            entries = self.load()
+
+            # Drop expired entries, temporary credentials would make the file grow forever
+            for expired in [k for k, entry in entries.items() if now - entry["time"] > self.ttl]:
+                del entries[expired]
+
+            entries[key] = {"time": now, "value": value}
+            self.save()
+
+    def invalidate(self, key: str = None):
+        """
+        Removes an entry from the cache, or every entry when no key is informed.
+
+        Args:
+            key (str): The entry key.
+        """
+        with self.lock:
+            if key is None:
+                self.entries = {}
+            else:
+                self.load().pop(key, None)
+            self.save()
+
+    def save(self):
+        """
+        Writes the cache file atomically.
+        """
+        temporary = None
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+
+            # One temporary file per write, processes saving at the same time must not share it
+            with tempfile.NamedTemporaryFile('w', dir=directory, suffix=".tmp", delete=False) as file:
+                temporary = file.name
+                json.dump(self.entries, file)
+            os.replace(temporary, self.path)
+        except OSError as error:
+            if temporary is not None and os.path.exists(temporary):
+                os.remove(temporary)
+            log.warning(f"Unable to write the cache file {self.path}: {error}")
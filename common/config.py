@@ -1,10 +1,23 @@
 import yaml
-from utils.logger import log
+
+from functools import lru_cache
 
 # Load configs from config file
 
 
+@lru_cache(maxsize=None)
 def load_configs(file='config.yml'):
+    """
+    Loads the configs from the config file.
+
+    The file is parsed only once per process, every module shares the same result.
+
+    Args:
+        file (str): The path of the config file.
+
+    Returns:
+        dict: The configs.
+    """
     with open(file, 'r') as file:
         config = yaml.safe_load(file)
     return config
@@ -1,14 +1,11 @@
 #!/usr/bin/env python3
 
-import yaml
+# Heavy modules (pyfiglet, rich.syntax, yaml dump, subprocess) are imported inside the commands that use them
 import typer # Import Typer for command-line interface creation
 from rich.console import Console # Import Console from Rich for better terminal output formatting
-from rich.syntax import Syntax
-from pyfiglet import Figlet
-from common import config
+from common.config import load_configs
 from utils import logger
 from AWS.core import app as aws
-from subprocess import call
 revise_version = "0.1"
 
 # Initialize Rich Console for better terminal output formatting
@@ -18,8 +15,7 @@ console = Console()
 app = typer.Typer()
 
 # Load Revise.cli configs from config file
-config = config.load_configs()
-config_yaml = yaml.dump(config)
+config = load_configs()
 
 if config["logs"]["enabled"] == False:
     logger.disable_logging()
@@ -40,6 +36,8 @@ def info():
     """
     GET Revise CLI Documentation.
     """
+    from pyfiglet import Figlet
+
     figlet = Figlet(font='standard')    
     print(figlet.renderText("Revise.cli"))
     console.print("A CLI to find improvement opportunities in your AWS account...")
@@ -57,8 +55,12 @@ def config():
     """
     GET Revise CLI configurations.
     """
+    import yaml
+    from rich.syntax import Syntax
+
     console.print("Revise config:")
     console.print()
+    config_yaml = yaml.dump(load_configs())
     synstax = Syntax(config_yaml, "yaml", theme="github-dark")
     console.print(synstax)
     
@@ -70,6 +72,8 @@ def dashboard():
     console.print("Revise Dashboard:")
     console.print()
     console.print("Coming soon...")
+    from subprocess import call
+
     call(["streamlit", "run", "dashboard.py"])
     # Entry point of the script
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+from rich.console import Console
+
+from AWS import recommendations
+from AWS.findings import StoppedInstanceVolume, get_columns, to_row
+from AWS.recommendations import TableRenderer
+
+
+def get_findings():
+    return [
+        StoppedInstanceVolume("us-east-1", "i-1", "/dev/sdf", "vol-1", "gp3", "8", "2026-01-01 00:00:00", 30),
+        # The volume was not found by the batched lookup
+        StoppedInstanceVolume("us-east-1", "i-2", "/dev/sdf", "vol-2", None, None, "2026-01-02 00:00:00", 29),
+        # The instance has no parseable stop time
+        StoppedInstanceVolume("us-east-1", "i-3", "/dev/sdg", "vol-3", "gp2", "20", None, None),
+    ]
+
+
+def test_rows_have_one_cell_per_column():
+    items = get_findings()
+    items[0].savings = 1.5
+    columns = get_columns(items)
+
+    assert columns == list(StoppedInstanceVolume.columns)
+    for item in items:
+        assert len(item.to_row()) == len(columns)
+        assert to_row(item, columns) == item.to_row()
+
+    assert items[1].to_row()[columns.index("VolumeType")] == "-"
+    assert items[2].to_row()[columns.index("StoppedAt")] == "-"
+    assert items[2].to_row()[columns.index("MonthlySavings")] == "-"
+
+
+def test_dictionaries_from_the_store_are_aligned():
+    items = [item.to_dict() for item in get_findings()]
+    columns = get_columns(items)
+
+    assert columns == [column for column in StoppedInstanceVolume.columns if column != "MonthlySavings"]
+    assert to_row(items[2], columns)[columns.index("StoppedAt")] == "-"
+    assert to_row(items[2], columns)[columns.index("Size")] == "20"
+
+
+def test_table_keeps_cells_under_their_columns(monkeypatch):
+    console = Console(record=True, width=300)
+    monkeypatch.setattr(recommendations, "console", console)
+
+    items = get_findings()
+    items[2].savings = 1.5
+    renderer = TableRenderer("Volumes", "", "")
+    renderer.add(items)
+    renderer.show()
+
+    lines = [line.split("│")[1:-1] for line in console.export_text().splitlines() if line.startswith("│")]
+    header, rows = [cell.strip() for cell in lines[0]], [[cell.strip() for cell in line] for line in lines[1:]]
+    row = {cell[header.index("instance")]: dict(zip(header, cell)) for cell in rows}
+
+    assert header == list(StoppedInstanceVolume.columns)
+    assert row["i-2"]["VolumeType"] == "-" and row["i-2"]["StoppedAt"] == "2026-01-02 00:00:00"
+    assert row["i-3"]["StoppedAt"] == "-" and row["i-3"]["MonthlySavings"] == "1.5"
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+from pathlib import Path
+
+# Root of the repository, where config.yml is read from
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time of AWS.core in microseconds. It takes about 10ms with the lazy imports,
+# importing boto3 again would add about 80ms
+IMPORT_BUDGET = 50_000
+
+# Runs the CLI in-process and prints whether the heavy modules were loaded
+PROBE = """
+import runpy, sys
+sys.argv = ["revise.py", "version"]
+try:
+    runpy.run_path("revise.py", run_name="__main__")
+except SystemExit:
+    pass
+print("loaded:" + ",".join(module for module in ("boto3", "botocore", "pyfiglet") if module in sys.modules))
+"""
+
+
+def test_version_does_not_import_boto3():
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert "Revise.cli, version" in result.stdout
+    assert result.stdout.strip().splitlines()[-1] == "loaded:"
+
+
+def test_core_import_budget():
+    result = subprocess.run([sys.executable, "-X", "importtime", "revise.py", "version"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+
+    # Lines look like "import time:  self [us] | cumulative | module"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, module = line.split("|")
+            if total.strip().isdigit():
+                cumulative[module.strip()] = int(total)
+
+    assert cumulative["AWS.core"] < IMPORT_BUDGET
@@ -1,16 +1,19 @@
+import atexit
+import json
 import logging
-from rich.logging import RichHandler
+import queue
+import random
+
+from logging.handlers import QueueHandler, QueueListener
 
 FORMAT = "%(asctime)s %(message)s"
-logging.basicConfig(
-    filename="revise.log",
-    encoding="utf-8",
-    level="DEBUG",
-    format=FORMAT,
-    datefmt="[%Y-%m-%d %H:%M:%S]",
-    # handlers=[RichHandler(show_path=False, show_time=True,
-    #                       omit_repeated_times=False)]
-)
+DATEFMT = "[%Y-%m-%d %H:%M:%S]"
+
+# Used when config.yml has no logs section or can not be read
+DEFAULTS = {"enabled": True, "file": "revise.log", "level": "INFO", "format": "json", "sampling": {}}
+
+# Attributes of every LogRecord, the other ones were added with extra= and are written as fields
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
 
 logging.getLogger('boto3').setLevel(logging.CRITICAL)
 logging.getLogger('botocore').setLevel(logging.CRITICAL)
@@ -19,6 +22,127 @@ logging.getLogger('urllib3').setLevel(logging.CRITICAL)
 
 log = logging.getLogger("revise")
 
+# Writes the queued records on a background thread
+listener = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats each record as a JSON object per line. Fields passed with extra=, like the account
+    or the region, are written as attributes of the object.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queues the records as they are. Messages are merged and formatted by the listener thread,
+    not by the thread that logs them.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the records of each level. Dropped records are never formatted or queued.
+    """
+
+    def __init__(self, rates: dict):
+        """
+        Initializes the SamplingFilter.
+
+        Args:
+            rates (dict): The fraction of the records kept, by level name. Exemple: {"DEBUG": 0.1}
+        """
+        super().__init__()
+        self.rates = {logging.getLevelName(str(level).upper()): float(rate) for level, rate in (rates or {}).items()}
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1 or random.random() < rate
+
+
+def load_settings():
+    """
+    Reads the logs section of config.yml, completed with the defaults.
+
+    Returns:
+        dict: The logging settings.
+    """
+    from common.config import load_configs
+
+    try:
+        settings = load_configs().get("logs") or {}
+    except OSError:
+        settings = {}
+    return dict(DEFAULTS, **settings)
+
+
+def configure(settings: dict = None):
+    """
+    Sends the records to a queue, written to the log file by a background thread, so the scan
+    threads never wait for the disk. Calling it again replaces the previous configuration.
+
+    Args:
+        settings (dict): The logs section of config.yml. None reads it from config.yml.
+    """
+    global listener
+
+    settings = dict(DEFAULTS, **(settings or {})) if settings is not None else load_settings()
+
+    root = logging.getLogger()
+    if listener is not None:
+        listener.stop()
+        listener = None
+    for handler in [handler for handler in root.handlers if isinstance(handler, QueueHandler)]:
+        root.removeHandler(handler)
+
+    file_handler = logging.FileHandler(settings["file"], encoding="utf-8", delay=True)
+    if settings["format"] == "json":
+        file_handler.setFormatter(JSONFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(FORMAT, datefmt=DATEFMT))
+
+    records = queue.SimpleQueue()
+    handler = BackgroundHandler(records)
+    handler.addFilter(SamplingFilter(settings["sampling"]))
+    root.addHandler(handler)
+    root.setLevel(str(settings["level"]).upper())
+
+    listener = QueueListener(records, file_handler)
+    listener.start()
+
+    log.disabled = not settings["enabled"]
+
+
+def shutdown():
+    """
+    Writes the queued records and stops the background thread.
+    """
+    global listener
+
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+atexit.register(shutdown)
+configure()
+
 
 def disable_logging():
     log.disabled = True